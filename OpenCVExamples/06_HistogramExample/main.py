@@ -51,6 +51,100 @@ def alternative_histogram_computation(img):
         print("ERROR: The image is empty!!!")
         return None
 
+def get_amount_samples(max_error, confidence=0.99):
+    '''
+    Compute how many random pixels we have to take from an image so the
+    accumulative probability function computed with them differs from the real
+    one in less than max_error, at any gray-level, with the given confidence.
+
+    This bound comes from the Dvoretzky-Kiefer-Wolfowitz inequality:
+        P(max |F_n(x) - F(x)| > e) <= 2 * exp(-2 * n * e^2)
+    where F_n is the accumulative probability function of n random samples, and
+    F is the one of the full image. Note that the amount of samples does not
+    depend on the image size.
+
+    The examples 06, 09 and 14 have their own copy of this function, in the
+    same way that each example that uses image_widget.py has its own copy of it:
+    each example folder is run on its own, and the examples do not import
+    each other.
+
+    Args:
+        max_error: Maximum allowed difference between the approximated and the
+            real accumulative probability functions. Value in the range (0, 1).
+        confidence (optional): Probability that the error is lower than max_error.
+            Value in the range (0, 1).
+
+    Returns:
+        Integer with the amount of samples required.
+    '''
+    assert(max_error > 0 and max_error < 1)
+    assert(confidence > 0 and confidence < 1)
+    return int(np.ceil(np.log(2.0 / (1.0 - confidence)) / (2.0 * max_error**2)))
+
+def sampled_histogram_computation(img, sampling_rate=None, max_error=None, confidence=0.99):
+    '''
+    Compute an approximation of the histogram of an image, by using only a
+    random subset of its pixels. It is useful for very big images, where the
+    exact histogram is expensive, and for operations such as the histogram
+    equalization, where the exact amount of pixels per level is not important.
+
+    The amount of pixels to take is given either by a sampling rate, or by the
+    maximum error we accept in the accumulative probability function (see
+    get_amount_samples). If none of them is given, or if the amount of samples
+    is higher than the amount of pixels, the exact histogram is computed.
+
+    Args:
+        img: Input gray-level image from which we want to compute the histogram
+        sampling_rate (optional): Fraction of the pixels to take, in the range (0, 1].
+        max_error (optional): Maximum error allowed in the accumulative probability
+            function. If given, it has priority over sampling_rate.
+        confidence (optional): Probability that the error is lower than max_error.
+
+    Returns:
+        None if the image is not gray-level, or if it is empty. It returns
+        a vector with as many elements as possible gray-levels can be in the image.
+        Each position contains the estimated amount of pixels of the image
+        that have that value, so the sum of all the elements is the amount of
+        pixels of the image.
+    '''
+    np_img = np.asarray(img)
+    # We check the image is not empty
+    if not np_img.size:
+        print("ERROR: The image is empty!!!")
+        return None
+    # We check if the image is gray-level
+    if len(np_img.shape) != 2:
+        print("ERROR: The provided image is not gray-level!!!. Its shape is {}".format(np_img.shape))
+        return None
+    amount_bits = 8 * np_img.itemsize
+    amount_bins = np.power(2, amount_bits)
+
+    # We determine how many pixels we have to take
+    if not max_error is None:
+        amount_samples = get_amount_samples(max_error, confidence)
+    elif not sampling_rate is None:
+        assert(sampling_rate > 0 and sampling_rate <= 1)
+        amount_samples = int(np.ceil(sampling_rate * np_img.size))
+    else:
+        amount_samples = np_img.size
+
+    if amount_samples >= np_img.size:
+        # Taking as many samples as pixels is not cheaper than computing the
+        # exact histogram, so we count all the pixels.
+        return np.array(np.bincount(np_img.ravel(), minlength=amount_bins), dtype=np.float64)
+
+    # We choose random rows and columns independently. This way we do not need
+    # to flatten the image, which would create a copy of it if the image is
+    # a channel of a color image.
+    rng = np.random.default_rng()
+    rows = rng.integers(0, np_img.shape[0], amount_samples)
+    cols = rng.integers(0, np_img.shape[1], amount_samples)
+    samples = np_img[rows, cols]
+
+    # We count the samples, and we scale the result so it represents the whole image
+    hist = np.bincount(samples, minlength=amount_bins)
+    return hist * (float(np_img.size) / amount_samples)
+
 def compute_histogram(img):
     '''
     Compute the image provided. In order to have an histogram, the image must
@@ -174,6 +268,19 @@ def main():
     hist2 = alternative_histogram_computation(gray_img)
     print("Alternative implementation: {}".format(time.time() - begin))
 
+    begin = time.time()
+    # We compute an approximated histogram, from a random subset of pixels. We
+    # ask for an error lower than 0.01 in the accumulative probability function,
+    # which needs the same amount of pixels whatever the image size is.
+    max_error = 0.01
+    hist3 = sampled_histogram_computation(gray_img, max_error=max_error)
+    print("Sampled implementation ({} pixels of {}): {}".format(
+        min(get_amount_samples(max_error), gray_img.size), gray_img.size, time.time() - begin))
+    # We compare the accumulative probability functions of both histograms
+    if not hist2 is None and not hist3 is None:
+        error = np.max(np.abs(np.cumsum(hist3) - np.cumsum(hist2))) / gray_img.size
+        print("Error of the sampled accumulative probability function: {:.4f} (max allowed: {})".format(error, max_error))
+
     # We check if the histogram was computed correctly or not.
     if not hist is None:
         # If the histogram has been computed correctly, we show it.
@@ -184,6 +291,11 @@ def main():
         # If the histogram has been computed correctly, we show it.
         show_histogram(hist2, 'Alternative Gray-level image histogram')
 
+    # We check if the sampled histogram was computed correctly or not.
+    if not hist3 is None:
+        # If the histogram has been computed correctly, we show it.
+        show_histogram(hist3, 'Sampled Gray-level image histogram')
+
     # We show the loaded gray-level image
     gl_window_name = 'Gray-level image'
     # We create a namedWindow, with the flag cv2.WINDOW_NORMAL in order to be able
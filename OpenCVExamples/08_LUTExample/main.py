@@ -1,11 +1,32 @@
 import cv2
 import os
+import functools
 
 import numpy as np
 import matplotlib.pyplot as plt
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 
+def read_only_lut(lut):
+    '''
+    Convert a LUT into an 8-bits coded array that cannot be modified.
+
+    The functions that create the LUTs keep their results in a cache (see
+    functools.lru_cache), so the same array is returned each time we ask for
+    the same LUT. If someone modifies that array, all the future calls would
+    return the modified LUT, so we forbid any modification.
+
+    Args:
+        lut: LUT to be converted
+
+    Returns:
+        Read-only LUT coded in 8-bits.
+    '''
+    lut = np.array(lut, dtype=np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+@functools.lru_cache(maxsize=None)
 def increase_brightness_lut():
     '''
     We create a LUT that increases the brightness.
@@ -21,8 +42,9 @@ def increase_brightness_lut():
     # We truncate the elements higher than 255 to be 255 (saturation area)
     lut[lut > 255] = 255
     # We reconvert the LUT to be 8-bits coded.
-    return np.array(lut, dtype=np.uint8)
+    return read_only_lut(lut)
 
+@functools.lru_cache(maxsize=None)
 def increase_contrast_lut():
     '''
     We create a LUT that increases the contrast.
@@ -37,8 +59,9 @@ def increase_contrast_lut():
     # We set all the elements starting from index 200 to be 255 (saturation area)
     lut[200:] = 255
     # We reconvert the LUT to be 8-bits coded.
-    return np.array(lut, dtype=np.uint8)
+    return read_only_lut(lut)
 
+@functools.lru_cache(maxsize=None)
 def gamma_correction_lut(gamma_value):
     '''
     We create a LUT that follows the gamma function.
@@ -56,7 +79,31 @@ def gamma_correction_lut(gamma_value):
     #                       Io = 255 * (I / 255)^gamma
     # where I is the input intensity value and I0 is the output intensity value.
     # We return an array coded in 8 bits
-    return np.array(255 * np.power((input_array / 255.0), gamma_value), dtype=np.uint8)
+    return read_only_lut(255 * np.power((input_array / 255.0), gamma_value))
+
+def compose_luts(*luts):
+    '''
+    Combine several LUTs into a single one. Applying the resulting LUT to an
+    image gives the same result as applying each LUT, one after the other, in
+    the given order. Since a LUT has only 256 entries (65536 for 16-bits images), composing them is much
+    cheaper than going over the whole image once per LUT.
+
+    For two LUTs, the composed LUT is lut2[lut1]: for the input level i, the
+    first LUT gives lut1[i], and the second LUT maps this value to lut2[lut1[i]].
+
+    Args:
+        luts: LUTs to be combined, in the order they have to be applied.
+
+    Returns:
+        LUT with as many entries as the first LUT, coded as the last LUT.
+    '''
+    assert(len(luts) > 0)
+    # We start with the first LUT, and we send its output through each of the
+    # following LUTs.
+    composed = get_int_lut(luts[0])
+    for lut in luts[1:]:
+        composed = get_int_lut(lut)[composed]
+    return composed
 
 def plot_lut(lut, title):
     '''
@@ -82,22 +129,79 @@ def plot_lut(lut, title):
     # We show the graph in non-blocking mode.
     plt.show(block=False)
 
-def apply_lut(img, lut):
+def get_int_lut(lut):
+    '''
+    Convert a LUT into a NumPy array of integers, so it can be used to index
+    other arrays. LUTs already coded in 8 or 16 bits are kept as they are (16-bits
+    LUTs are used for 16-bits images, and they have 65536 entries). Any other
+    LUT is converted to be 16-bits coded if it has more than 256 entries or any
+    value higher than 255, and 8-bits coded otherwise. The values outside the
+    range of the chosen type are saturated, instead of wrapping around.
+
+    Args:
+        lut: LUT to be converted
+
+    Returns:
+        LUT coded in 8 or 16 bits.
+    '''
+    int_lut = np.asarray(lut)
+    if int_lut.dtype != np.uint8 and int_lut.dtype != np.uint16:
+        if int_lut.shape[0] > 256 or (int_lut.size and np.max(int_lut) > 255):
+            int_type = np.uint16
+        else:
+            int_type = np.uint8
+        # We saturate the values, as cv2.LUT and cv2.convertScaleAbs do
+        int_info = np.iinfo(int_type)
+        int_lut = np.array(np.clip(int_lut, int_info.min, int_info.max), dtype=int_type)
+    return int_lut
+
+def apply_lut(img, lut, out=None):
     '''
-    Function to apply a given LUT. This function works for gray-level images.
+    Function to apply a given LUT. This function works for gray-level images
+    and for color images.
+
+    For gray-level images, the LUT is a vector with one entry per possible
+    gray-level (256 for 8-bits images, 65536 for 16-bits images). For color
+    images, we can provide either a single vector, applied to all the channels,
+    or a matrix with one column per channel, so each channel has its own LUT.
+
+    By default, a new image is created. If we already have an image where
+    we want to store the result (for example, when we process a video, and
+    the output image is always the same), we can give it with the argument out.
+    If out is the input image itself, the LUT is applied in-place.
 
     Args:
-        img: Input image to which we will apply the transformation
-        lut: LUT to be applied
+        img: Input image to which we will apply the transformation. Its values
+            must be integers, coded in 8 or 16 bits.
+        lut: LUT to be applied. Shape (N,) or (N, channels), where N = 2^(bits of the image).
+        out (optional): Image where the result is written. It must have the
+            same shape as the input image, and the same data type as the LUT.
 
     Returns:
-        Matrix coded in 8-bits that is the result of applyting the given LUT
-        to the input image.
+        Matrix that is the result of applyting the given LUT to the input image.
+        It is coded in 8-bits, unless the LUT is coded in 16-bits.
     '''
     # We convert the input lut to be a numpy array, in order to profit the indexing
     # property of the NumPy arrays.
-    int_lut = np.array(lut, dtype=np.uint8)
-    return int_lut[img]
+    int_lut = get_int_lut(lut)
+    # We check the LUT has one entry for each possible level of the image
+    assert(int_lut.shape[0] == np.power(2, 8 * img.itemsize))
+
+    if out is None:
+        out = np.empty(img.shape, dtype=int_lut.dtype)
+    assert(out.shape == img.shape and out.dtype == int_lut.dtype)
+
+    # np.take does the same as int_lut[img], but it writes directly into out.
+    # We use mode='clip' since the indexes are always valid (we checked the
+    # size of the LUT), and in this mode NumPy does not create a temporary copy.
+    if len(int_lut.shape) == 1:
+        np.take(int_lut, img, out=out, mode='clip')
+    else:
+        # One LUT per channel: we apply each column of the LUT to its channel
+        assert(len(img.shape) == 3 and img.shape[2] == int_lut.shape[1])
+        for channel in range(img.shape[2]):
+            np.take(int_lut[:,channel], img[:,:,channel], out=out[:,:,channel], mode='clip')
+    return out
 
 def main():
     '''
@@ -144,6 +248,13 @@ def main():
     cv2.namedWindow(gl_window_name, cv2.WINDOW_NORMAL)
     cv2.imshow(gl_window_name, apply_lut(gray_img, gamma_correction_lut(gamma)))
 
+    # Original image after applying the three LUTs, one after the other. We combine
+    # them first, so we go over the image only once.
+    gl_window_name = 'Brightness, contrast and gamma correction'
+    cv2.namedWindow(gl_window_name, cv2.WINDOW_NORMAL)
+    cv2.imshow(gl_window_name, apply_lut(gray_img, compose_luts(increase_brightness_lut(),
+        increase_contrast_lut(), gamma_correction_lut(gamma))))
+
     # We always need these lines
     key = cv2.waitKey()
     while chr(key) != 'q' and chr(key) != 'Q':
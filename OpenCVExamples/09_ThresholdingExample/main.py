@@ -5,28 +5,268 @@ import numpy as np
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 
-def threshold_image(img, threshold):
+def get_threshold_lut(threshold, amount_levels=256, high_value=255):
+    '''
+    Create the LUT that binarizes an image: all the levels higher than the
+    threshold are mapped to high_value, and the rest are mapped to 0.
+
+    Args:
+        threshold: Integer value that defines the threshold value
+        amount_levels (optional): Amount of entries of the LUT. 256 for 8-bits
+            images, 65536 for 16-bits images.
+        high_value (optional): Value given to the levels higher than the threshold.
+
+    Returns:
+        LUT coded in 8-bits, with amount_levels entries.
+    '''
+    lut = np.zeros(amount_levels, dtype=np.uint8)
+    # max() avoids a negative threshold to be used as an index from the end
+    lut[max(int(threshold) + 1, 0):] = high_value
+    return lut
+
+def threshold_image(img, threshold, out=None):
     '''
     This function creates a binary image based on the gray-level image.
     If the pixel intensity is higher than the threshold, the image value
     is set to 255. If not, it is set to 0.
 
+    Instead of comparing each pixel with the threshold, we create a LUT (see
+    get_threshold_lut) and we apply it. This way, we go over the image only once,
+    and the only image created is the output.
+
     Args:
-        img: Input image to be binarized
-        threshold: Integer value, between 0 and 255, that defines the threshold value
+        img: Input image to be binarized, coded in 8 or 16 bits.
+        threshold: Integer value that defines the threshold value
+        out (optional): Image coded in 8-bits, with the same shape as the input
+            image, where the result is written. If it is not given, a new image
+            is created.
 
     Returns:
-        Binary image
+        Binary image, coded in 8-bits
     '''
     # We convert the image into a numpy array, to ensure we can use the indexing property of
     # NumPy arrays
-    np_img = np.array(img)
-    # In all the places where the image value is higher than the threshold, we set it to 255
-    np_img[np_img > threshold] = 255
-    # In all the places where the image value is lower or equal than the threshold, we set it to 0
-    np_img[np_img <= threshold] = 0
+    np_img = np.asarray(img)
+    lut = get_threshold_lut(threshold, np.power(2, 8 * np_img.itemsize))
+    if out is None:
+        out = np.empty(np_img.shape, dtype=np.uint8)
+    # We apply the LUT, writing the result directly in the output image
+    np.take(lut, np_img, out=out, mode='clip')
     # We return the binarized image
-    return np_img
+    return out
+
+def get_amount_samples(max_error, confidence=0.99):
+    '''
+    Compute how many random pixels we have to take from an image so the
+    accumulative probability function computed with them differs from the real
+    one in less than max_error, at any gray-level, with the given confidence.
+
+    This bound comes from the Dvoretzky-Kiefer-Wolfowitz inequality:
+        P(max |F_n(x) - F(x)| > e) <= 2 * exp(-2 * n * e^2)
+    where F_n is the accumulative probability function of n random samples, and
+    F is the one of the full image. Note that the amount of samples does not
+    depend on the image size.
+
+    The examples 06, 09 and 14 have their own copy of this function, in the
+    same way that each example that uses image_widget.py has its own copy of it:
+    each example folder is run on its own, and the examples do not import
+    each other.
+
+    Args:
+        max_error: Maximum allowed difference between the approximated and the
+            real accumulative probability functions. Value in the range (0, 1).
+        confidence (optional): Probability that the error is lower than max_error.
+            Value in the range (0, 1).
+
+    Returns:
+        Integer with the amount of samples required.
+    '''
+    assert(max_error > 0 and max_error < 1)
+    assert(confidence > 0 and confidence < 1)
+    return int(np.ceil(np.log(2.0 / (1.0 - confidence)) / (2.0 * max_error**2)))
+
+def compute_histogram(img, sampling_rate=None, max_error=None, confidence=0.99):
+    '''
+    Compute the histogram of a gray-level image. For very big images, it can be
+    approximated by using only a random subset of its pixels: the Otsu
+    thresholds only depend on the accumulative probability function, so an
+    approximation is enough to find them.
+
+    The amount of pixels to take is given either by a sampling rate, or by the
+    maximum error we accept in the accumulative probability function (see
+    get_amount_samples). If none of them is given, or if the amount of samples
+    is higher than the amount of pixels, the exact histogram is computed.
+
+    Args:
+        img: Input gray-level image, coded in 8 or 16 bits.
+        sampling_rate (optional): Fraction of the pixels to take, in the range (0, 1].
+        max_error (optional): Maximum error allowed in the accumulative probability
+            function. If given, it has priority over sampling_rate.
+        confidence (optional): Probability that the error is lower than max_error.
+
+    Returns:
+        Vector with one entry per possible gray-level. Each position contains
+        the estimated amount of pixels of the image that have that value, so
+        the sum of all the elements is the amount of pixels of the image.
+    '''
+    np_img = np.asarray(img)
+    amount_bits = 8 * np_img.itemsize
+    amount_bins = np.power(2, amount_bits)
+
+    # We determine how many pixels we have to take
+    if not max_error is None:
+        amount_samples = get_amount_samples(max_error, confidence)
+    elif not sampling_rate is None:
+        assert(sampling_rate > 0 and sampling_rate <= 1)
+        amount_samples = int(np.ceil(sampling_rate * np_img.size))
+    else:
+        amount_samples = np_img.size
+
+    if amount_samples >= np_img.size:
+        # Taking as many samples as pixels is not cheaper than computing the
+        # exact histogram, so we count all the pixels.
+        return np.array(np.bincount(np_img.ravel(), minlength=amount_bins), dtype=np.float64)
+
+    # We choose random rows and columns independently. This way we do not need
+    # to flatten the image, which would create a copy of it if the image is
+    # a channel of a color image.
+    rng = np.random.default_rng()
+    rows = rng.integers(0, np_img.shape[0], amount_samples)
+    cols = rng.integers(0, np_img.shape[1], amount_samples)
+    samples = np_img[rows, cols]
+
+    # We count the samples, and we scale the result so it represents the whole image
+    hist = np.bincount(samples, minlength=amount_bins)
+    return hist * (float(np_img.size) / amount_samples)
+
+def otsu_threshold(hist):
+    '''
+    Compute the Otsu threshold from the histogram of an image. The Otsu threshold
+    is the one that maximizes the variance between the two classes (the pixels
+    lower or equal than the threshold, and the pixels higher than it):
+        sigma_b^2(t) = (mu_T * w(t) - mu(t))^2 / (w(t) * (1 - w(t)))
+    where w(t) is the probability of the first class, mu(t) is the accumulative
+    mean up to t, and mu_T is the mean of the whole image.
+
+    Only the histogram is needed, so the image is not read again.
+
+    Args:
+        hist: Histogram of the image.
+
+    Returns:
+        Integer with the threshold value, to be used with threshold_image.
+    '''
+    prob = np.asarray(hist, dtype=np.float64)
+    prob = prob / np.sum(prob)
+    levels = np.arange(len(prob))
+    # Probability of the first class and its accumulative mean, for all the thresholds
+    omega = np.cumsum(prob)
+    mu = np.cumsum(prob * levels)
+    mu_total = mu[-1]
+
+    numerator = (mu_total * omega - mu)**2
+    denominator = omega * (1.0 - omega)
+    # When one of the classes is empty, the variance between classes is zero.
+    between_var = np.zeros(len(prob))
+    np.divide(numerator, denominator, out=between_var, where=denominator > 0)
+    return int(np.argmax(between_var))
+
+def multi_otsu_thresholds(hist, amount_classes=3):
+    '''
+    Compute several thresholds from the histogram of an image, that split the
+    gray-levels into amount_classes classes, maximizing the variance between
+    the classes (Otsu method, extended to several classes).
+
+    Maximizing the variance between classes is the same as maximizing the sum,
+    over all the classes, of S_k^2 / W_k, where W_k is the probability of the
+    class k and S_k is the sum of the levels times their probability. We find
+    the best thresholds with dynamic programming: for each level j, we keep
+    the best way to split the levels 0..j into c classes.
+
+    This function needs amount_classes * N^2 operations, for N entries in the
+    histogram, so it is meant for 8-bits histograms.
+
+    Args:
+        hist: Histogram of the image.
+        amount_classes (optional): Amount of classes, at least 2.
+
+    Returns:
+        List of amount_classes - 1 thresholds, in increasing order. The class k
+        contains the levels higher than thresholds[k-1] and lower or equal than
+        thresholds[k].
+    '''
+    assert(amount_classes >= 2)
+    prob = np.asarray(hist, dtype=np.float64)
+    prob = prob / np.sum(prob)
+    amount_levels = len(prob)
+    assert(amount_levels >= amount_classes)
+    # We add a zero at the beginning, so the sums over the levels a..b are
+    # cum[b + 1] - cum[a]
+    cum_prob = np.concatenate(([0.0], np.cumsum(prob)))
+    cum_mean = np.concatenate(([0.0], np.cumsum(prob * np.arange(amount_levels))))
+
+    def class_score(first, last):
+        # Score S^2 / W of the classes that go from each level in first until
+        # the level last (both included)
+        weight = cum_prob[last + 1] - cum_prob[first]
+        mean_sum = cum_mean[last + 1] - cum_mean[first]
+        score = np.zeros(np.shape(first))
+        np.divide(mean_sum**2, weight, out=score, where=weight > 0)
+        return score
+
+    # best[j] is the best score to split the levels 0..j into the current amount
+    # of classes. With one class, there is only one way to do it.
+    levels = np.arange(amount_levels)
+    best = class_score(np.zeros(amount_levels, dtype=int), levels)
+    # last_threshold[c][j] is the last threshold of the best split of 0..j into c + 2 classes
+    last_threshold = np.zeros((amount_classes - 1, amount_levels), dtype=int)
+
+    for c in range(1, amount_classes):
+        new_best = np.full(amount_levels, -np.inf)
+        for j in range(c, amount_levels):
+            # The previous class ends at the level i, and the new one goes from
+            # i + 1 until j
+            i = np.arange(c - 1, j)
+            scores = best[i] + class_score(i + 1, j)
+            k = np.argmax(scores)
+            new_best[j] = scores[k]
+            last_threshold[c - 1, j] = i[k]
+        best = new_best
+
+    # We go backwards, to recover all the thresholds
+    thresholds = []
+    j = amount_levels - 1
+    for c in range(amount_classes - 2, -1, -1):
+        j = last_threshold[c, j]
+        thresholds.append(int(j))
+    return thresholds[::-1]
+
+def multi_threshold_image(img, thresholds, out=None):
+    '''
+    Split a gray-level image into several classes, given by the thresholds. All
+    the pixels that belong to the same class get the same gray-level, and the
+    gray-levels of the classes are spread between 0 and 255.
+
+    As in threshold_image, we create a LUT and we apply it to the image.
+
+    Args:
+        img: Input image, coded in 8 or 16 bits.
+        thresholds: List of thresholds, in increasing order (see multi_otsu_thresholds)
+        out (optional): Image coded in 8-bits where the result is written.
+
+    Returns:
+        Image coded in 8-bits, with len(thresholds) + 1 different levels.
+    '''
+    np_img = np.asarray(img)
+    levels = np.arange(np.power(2, 8 * np_img.itemsize))
+    # For each level, we find to which class it belongs to: the class k is the
+    # amount of thresholds that are lower than the level.
+    classes = np.searchsorted(np.asarray(thresholds), levels, side='left')
+    lut = np.array(classes * 255 // len(thresholds), dtype=np.uint8)
+    if out is None:
+        out = np.empty(np_img.shape, dtype=np.uint8)
+    np.take(lut, np_img, out=out, mode='clip')
+    return out
 
 def main():
     # We define the image filepath we want to load
@@ -41,6 +281,20 @@ def main():
     # We threshold the image
     binary = threshold_image(gray_img, 100)
 
+    # We compute the threshold automatically, with the Otsu method, from the
+    # histogram of the image. We also split the image in three classes.
+    hist = compute_histogram(gray_img)
+    otsu = otsu_threshold(hist)
+    print("Otsu threshold: {}".format(otsu))
+    # The histogram of a random subset of the pixels gives almost the same
+    # threshold, and it is much cheaper for very big images (see compute_histogram)
+    sampled_otsu = otsu_threshold(compute_histogram(gray_img, max_error=0.005))
+    print("Otsu threshold from a sampled histogram: {}".format(sampled_otsu))
+    otsu_binary = threshold_image(gray_img, otsu)
+    thresholds = multi_otsu_thresholds(hist, 3)
+    print("Multi-level Otsu thresholds: {}".format(thresholds))
+    three_levels = multi_threshold_image(gray_img, thresholds)
+
     # We show the loaded gray-level image
     gl_window_name = 'Gray-level image'
     # We create a namedWindow, with the flag cv2.WINDOW_NORMAL in order to be able
@@ -57,6 +311,15 @@ def main():
     # We show the image.
     cv2.imshow(gl_window_name, binary)
 
+    # We show the images thresholded with the Otsu method
+    gl_window_name = 'Otsu binary image'
+    cv2.namedWindow(gl_window_name, cv2.WINDOW_NORMAL)
+    cv2.imshow(gl_window_name, otsu_binary)
+
+    gl_window_name = 'Otsu three levels image'
+    cv2.namedWindow(gl_window_name, cv2.WINDOW_NORMAL)
+    cv2.imshow(gl_window_name, three_levels)
+
     # We always need these lines
     key = cv2.waitKey()
     while chr(key) != 'q' and chr(key) != 'Q':
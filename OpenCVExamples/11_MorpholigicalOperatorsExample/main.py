@@ -1,6 +1,10 @@
 import cv2
 import os
 import numpy as np
+# This module contains the morphological operators: dilation, erosion, opening and closing
+from morphology import dilation, erosion, opening, closing
+# This module contains the same operators, for binary images packed in bits
+import packed_binary_image
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 
@@ -16,168 +20,13 @@ def threshold_image(img, threshold):
     Returns:
         Binary image, result of thresholding the input with the given threshold.
     '''
-    # We create 
-    binary = np.zeros(img.shape)
-    binary[img > threshold] = 1
+    # We compare all the pixels with the threshold, and we write the result
+    # (1 for True, 0 for False) directly in an image coded in 8-bits. This way
+    # we go over the image only once, and no intermediate image is created.
+    binary = np.empty(img.shape, dtype=np.uint8)
+    np.greater(img, threshold, out=binary)
     return binary
 
-def dilation(img, kernel):
-    '''
-    Apply the morphological operator DILATION with the given structuring element.
-    This function takes the structuring element (kernel) and it slides it over all
-    the image.
-
-    It takes the piece of image that falls below the kernel, and it makes a
-    pixel-wise multiplication, which gives us another matrix.
-    Then, the elements result of that multiplication are summed all together
-    and if the result of that sum if higher or equal to 1, we assign the value 1
-    to the central pixel. If this sum gives zero, we assign zero.
-
-    The reference element is taken as the central element of the kernel: If the
-    kernel size is MxN, the central pixel is: (M / 2, N / 2)
-
-    Args:
-        img: Binary input image (The only possible values are 0 and 1).
-        kernel: Structuring element. It is given in the form of a matrix, with
-            1s in the positions that belong to the structuring element, and
-            zeros in the rest of elements of the matrix.
-
-    Returns:
-        Binary image after applying dilation.    
-    '''
-    # We check that both sizes (rows and columns) of the kernel are odd numbers
-    assert(kernel.shape[0] % 2 and kernel.shape[1] % 2)
-
-    # We pad the image with zeros the input image, so the output image has
-    # the same size as the input after this operation
-    rows_to_add = int((kernel.shape[0] - 1) / 2.0)
-    cols_to_add = int((kernel.shape[1] - 1) / 2.0)
-    padded_img = np.pad(img, ((rows_to_add,rows_to_add), (cols_to_add,cols_to_add)), 'constant')
-
-    # We create an empty output image, filled with zeros
-    output = np.zeros(img.shape)
-
-    # We travel over all the output image (pixel by pixel).
-    for i in range(img.shape[0]):
-        for j in range(img.shape[1]):
-            # We compute the range of rows of the input image involved for the pixel (i,j)
-            start_row = i
-            end_row = i + kernel.shape[0]
-
-            # We compute the range of columns of the input image involved for the pixel (i,j)
-            start_col = j
-            end_col = j + kernel.shape[1]
-
-            # We multiply the kernel with the piece of image, element-wise, and
-            # we sum all the elements, result of that multiplication.
-            condition = np.sum(np.multiply(kernel, padded_img[start_row:end_row, start_col:end_col]))
-            # If the result of the previous operation is higher than 1, we assign
-            # 1 to the pixel (i,j). If not, do not do anything (the output image
-            # is already filled with zeros)
-            if condition >= 1:
-                output[i,j] = 1
-    return output
-
-def erosion(img, kernel):
-    '''
-    Apply the morphological operator EROSION with the given structuring element.
-    This function takes the structuring element (kernel) and it slides it over all
-    the image.
-
-    It takes the piece of image that falls below the kernel, and it makes a
-    pixel-wise multiplication, which gives us another matrix.
-    Then, all the elements result of that multiplication are multiplied together
-    and if the result is 1, we assign the value 1 to the central pixel.
-    If this multiplication gives zero, we assign zero.
-
-    The reference element is taken as the central element of the kernel: If the
-    kernel size is MxN, the central pixel is: (M / 2, N / 2)
-
-    Args:
-        img: Binary input image (The only possible values are 0 and 1).
-        kernel: Structuring element. It is given in the form of a matrix, with
-            1s in the positions that belong to the structuring element, and
-            zeros in the rest of elements of the matrix.
-            IMPORTANT: The size of the kernel must be an odd number (3, 5, 7, etc).
-
-    Returns:
-        Binary image after applying erosion.
-    '''
-    # We check that both sizes (rows and columns) of the kernel are odd numbers
-    assert(kernel.shape[0] % 2 and kernel.shape[1] % 2)
-
-    # We pad the image with zeros the input image, so the output image has
-    # the same size as the input after this operation
-    rows_to_add = int((kernel.shape[0] - 1) / 2.0)
-    cols_to_add = int((kernel.shape[1] - 1) / 2.0)
-    padded_img = np.pad(img, ((rows_to_add,rows_to_add), (cols_to_add,cols_to_add)), 'constant')
-
-    # We create an empty output image, filled with zeros
-    output = np.zeros(img.shape)
-
-    # We travel over all the output image (pixel by pixel).
-    for i in range(img.shape[0]):
-        for j in range(img.shape[1]):
-            # We compute the range of rows of the input image involved for the pixel (i,j)
-            start_row = i
-            end_row = i + kernel.shape[0]
-
-            # We compute the range of columns of the input image involved for the pixel (i,j)
-            start_col = j
-            end_col = j + kernel.shape[1]
-
-            # We multiply the kernel with the piece of image, element-wise, and
-            # we multiply all the elements, result of that multiplication.
-            condition = np.prod(np.multiply(kernel, padded_img[start_row:end_row, start_col:end_col]))
-
-            # If the result of the previous operation is equal to 1, we assign
-            # 1 to the pixel (i,j). If not, do not do anything (the output image
-            # is already filled with zeros)
-            if condition == 1:
-                output[i,j] = 1
-
-    return output
-
-def opening(img, kernel):
-    '''
-    Apply the opening operation to the image. This operation consists of applying
-    sequentially, the erosion operation and the dilation operation. Both
-    morphological operations are applied using the same structuring element.
-
-    Args:
-        img: Binary input image (The only possible values are 0 and 1).
-        kernel: Structuring element. It is given in the form of a matrix, with
-            1s in the positions that belong to the structuring element, and
-            zeros in the rest of elements of the matrix.
-            IMPORTANT: The size of the kernel must be an odd number (3, 5, 7, etc).
-
-    Returns:
-        Binary image after applying opening.
-    '''
-    output = erosion(img,kernel)
-    output = dilation(output,kernel)
-    return output
-
-def closing(img, kernel):
-    '''
-    Apply the closing operation to the image. This operation consists of applying
-    sequentially, the dilation operation and the erosion operation. Both
-    morphological operations are applied using the same structuring element.
-
-    Args:
-        img: Binary input image (The only possible values are 0 and 1).
-        kernel: Structuring element. It is given in the form of a matrix, with
-            1s in the positions that belong to the structuring element, and
-            zeros in the rest of elements of the matrix.
-            IMPORTANT: The size of the kernel must be an odd number (3, 5, 7, etc).
-
-    Returns:
-        Binary image after applying opening.
-    '''
-    output = dilation(img,kernel)
-    output = erosion(output,kernel)
-    return output
-
 def main():
     # We define the image filepath we want to load.
     color_image_filepath = os.path.join(root_dir, 'images', 'metal.png')
@@ -200,6 +49,12 @@ def main():
     opened_img = opening(binary, np.ones((5,5)))
     closed_img = closing(binary, np.ones((5,5)))
 
+    # We apply the opening to the image packed in bits (one bit per pixel instead
+    # of one byte), and we check the result is the same.
+    packed_binary = packed_binary_image.pack_binary_image(binary)
+    packed_opened = packed_binary_image.opening(packed_binary, np.ones((5,5)))
+    print("Packed opening gives the same result: {}".format(np.array_equal(packed_opened.unpack(), opened_img)))
+
     ######################## We show the results ########################
     # We show the loaded gray-level image
     gl_window_name = 'Gray-level image'
@@ -0,0 +1,238 @@
+import cv2
+import numpy as np
+
+'''
+Binary morphological operators: dilation, erosion, opening and closing.
+
+Instead of travelling over the image pixel by pixel, and looking at the piece of
+image that falls below the kernel, we travel over the kernel: for each element
+of the structuring element that is 1, we take the padded image shifted by the
+position of that element. This shifted image is a view of the padded image
+(no copy is made), and it has the same size as the output.
+    - Dilation: a pixel is 1 if at least one of the shifted images is 1 at that
+        pixel, so we combine all the shifted images with an OR.
+    - Erosion: a pixel is 1 if all the shifted images are 1 at that pixel, so we
+        combine all the shifted images with an AND.
+
+This way, the amount of Python operations depends on the kernel size only, and
+each of them processes the whole image at once.
+
+As in the definitions, the image is padded with zeros, so the output image has
+the same size as the input, and the reference element is the central element
+of the kernel: if the kernel size is MxN, the central pixel is (M / 2, N / 2).
+'''
+
+def pad_binary_image(img, kernel):
+    '''
+    Pad a binary image with zeros, so that a kernel centered on any pixel of the
+    image falls completely inside the padded image.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        kernel: Structuring element. IMPORTANT: The size of the kernel must be
+            an odd number (3, 5, 7, etc).
+
+    Returns:
+        Padded image, with boolean values.
+    '''
+    # We check that both sizes (rows and columns) of the kernel are odd numbers
+    assert(kernel.shape[0] % 2 and kernel.shape[1] % 2)
+
+    rows_to_add = int((kernel.shape[0] - 1) / 2.0)
+    cols_to_add = int((kernel.shape[1] - 1) / 2.0)
+    return np.pad(np.asarray(img) != 0, ((rows_to_add,rows_to_add), (cols_to_add,cols_to_add)), 'constant')
+
+def dilation(img, kernel):
+    '''
+    Apply the morphological operator DILATION with the given structuring element.
+    A pixel of the output is 1 if at least one of the pixels below the ones of
+    the kernel is 1.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        kernel: Structuring element. It is given in the form of a matrix, with
+            1s in the positions that belong to the structuring element, and
+            zeros in the rest of elements of the matrix.
+            IMPORTANT: The size of the kernel must be an odd number (3, 5, 7, etc).
+
+    Returns:
+        Binary image after applying dilation, coded in 8-bits.
+    '''
+    kernel = np.asarray(kernel)
+    padded_img = pad_binary_image(img, kernel)
+    rows, cols = np.shape(img)
+
+    # We start with an empty image, and we add (OR) the image shifted by each
+    # element of the kernel.
+    output = np.zeros((rows, cols), dtype=bool)
+    for i, j in zip(*np.nonzero(kernel)):
+        output |= padded_img[i:i + rows, j:j + cols]
+    return output.view(np.uint8)
+
+def erosion(img, kernel):
+    '''
+    Apply the morphological operator EROSION with the given structuring element.
+    A pixel of the output is 1 if all the pixels below the ones of the kernel
+    are 1.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        kernel: Structuring element. It is given in the form of a matrix, with
+            1s in the positions that belong to the structuring element, and
+            zeros in the rest of elements of the matrix.
+            IMPORTANT: The size of the kernel must be an odd number (3, 5, 7, etc).
+
+    Returns:
+        Binary image after applying erosion, coded in 8-bits.
+    '''
+    kernel = np.asarray(kernel)
+    padded_img = pad_binary_image(img, kernel)
+    rows, cols = np.shape(img)
+
+    # We start with a full image, and we keep (AND) only the pixels that are
+    # 1 in the image shifted by each element of the kernel.
+    output = np.ones((rows, cols), dtype=bool)
+    for i, j in zip(*np.nonzero(kernel)):
+        output &= padded_img[i:i + rows, j:j + cols]
+    return output.view(np.uint8)
+
+def opening(img, kernel):
+    '''
+    Apply the opening operation to the image. This operation consists of applying
+    sequentially, the erosion operation and the dilation operation. Both
+    morphological operations are applied using the same structuring element.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        kernel: Structuring element. IMPORTANT: The size of the kernel must be
+            an odd number (3, 5, 7, etc).
+
+    Returns:
+        Binary image after applying opening.
+    '''
+    output = erosion(img, kernel)
+    output = dilation(output, kernel)
+    return output
+
+def closing(img, kernel):
+    '''
+    Apply the closing operation to the image. This operation consists of applying
+    sequentially, the dilation operation and the erosion operation. Both
+    morphological operations are applied using the same structuring element.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        kernel: Structuring element. IMPORTANT: The size of the kernel must be
+            an odd number (3, 5, 7, etc).
+
+    Returns:
+        Binary image after applying closing.
+    '''
+    output = dilation(img, kernel)
+    output = erosion(output, kernel)
+    return output
+
+def get_disk_kernel(radius):
+    '''
+    Create a disk structuring element: all the elements at an Euclidean distance
+    lower or equal than radius from the center.
+
+    Args:
+        radius: Integer radius of the disk.
+
+    Returns:
+        Matrix of size (2 * radius + 1) x (2 * radius + 1), with 1s inside the disk.
+    '''
+    coords = np.arange(-radius, radius + 1)
+    return np.array(coords[:, None]**2 + coords[None, :]**2 <= radius**2, dtype=np.uint8)
+
+def get_distance_transforms(img):
+    '''
+    Compute the two Euclidean distance transforms needed by the disk operators:
+    for each pixel, the distance to the closest pixel of the background (0), and
+    the distance to the closest pixel of the objects (1).
+
+    As in the other operators, the pixels outside the image are considered as
+    background, so we add a border of zeros before computing the transforms.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+
+    Returns:
+        Tuple with two float images of the same size as the input: the distance
+        to the background, and the distance to the objects.
+    '''
+    binary = np.asarray(img) != 0
+    padded = np.pad(binary, 1, 'constant').view(np.uint8)
+    # cv2.distanceTransform gives the distance to the closest zero pixel. With
+    # DIST_MASK_PRECISE, the distance is the exact Euclidean distance.
+    to_background = cv2.distanceTransform(padded, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)[1:-1, 1:-1]
+    # For the distance to the objects, we invert the image. The border is not an
+    # object, so it has to be 1 in the inverted image.
+    inverted = np.pad(~binary, 1, 'constant', constant_values=True).view(np.uint8)
+    to_objects = cv2.distanceTransform(inverted, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)[1:-1, 1:-1]
+    if not binary.any():
+        # There is no object at all: the distance to them is infinite
+        to_objects = np.full(binary.shape, np.inf, dtype=np.float32)
+    return to_background, to_objects
+
+# The distances between pixels are square roots of integers, so two different
+# distances differ at least in 1 / (2 * distance). We use this tolerance to compare
+# the distances with the radius, since they are computed in float precision.
+DISTANCE_TOLERANCE = 1e-4
+
+def disk_erosion(img, radius, distances=None):
+    '''
+    Apply the EROSION with a disk of the given radius (see get_disk_kernel),
+    by thresholding the distance transform: a pixel is kept if the closest
+    pixel of the background is farther than radius.
+
+    The cost does not depend on the radius. If the distance transforms are given
+    (see get_distance_transforms), eroding with several radius only costs
+    a comparison per pixel.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        radius: Radius of the disk.
+        distances (optional): Result of get_distance_transforms(img).
+
+    Returns:
+        Binary image after applying erosion, coded in 8-bits.
+    '''
+    if distances is None:
+        distances = get_distance_transforms(img)
+    return (distances[0] > radius + DISTANCE_TOLERANCE).view(np.uint8)
+
+def disk_dilation(img, radius, distances=None):
+    '''
+    Apply the DILATION with a disk of the given radius (see get_disk_kernel),
+    by thresholding the distance transform: a pixel is set to 1 if the closest
+    pixel of the objects is at a distance lower or equal than radius.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+        radius: Radius of the disk.
+        distances (optional): Result of get_distance_transforms(img).
+
+    Returns:
+        Binary image after applying dilation, coded in 8-bits.
+    '''
+    if distances is None:
+        distances = get_distance_transforms(img)
+    return (distances[1] <= radius + DISTANCE_TOLERANCE).view(np.uint8)
+
+def disk_opening(img, radius, distances=None):
+    '''
+    Apply the opening with a disk of the given radius. The dilation is applied
+    to the eroded image, so a second distance transform is computed.
+    '''
+    eroded = disk_erosion(img, radius, distances)
+    return disk_dilation(eroded, radius)
+
+def disk_closing(img, radius, distances=None):
+    '''
+    Apply the closing with a disk of the given radius. The erosion is applied
+    to the dilated image, so a second distance transform is computed.
+    '''
+    dilated = disk_dilation(img, radius, distances)
+    return disk_erosion(dilated, radius)
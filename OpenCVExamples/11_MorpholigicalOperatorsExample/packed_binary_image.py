@@ -0,0 +1,206 @@
+import numpy as np
+
+'''
+This class holds a binary image packed in bits: each pixel takes a single bit,
+instead of one byte (uint8) or eight bytes (float64). Each row of the image is
+stored as an array of 64-bits words, so the pixel (i, j) is the bit j % 64 of
+the word j // 64 of the row i.
+
+With this representation, the logical operations (AND, OR) and the shifts
+process 64 pixels at once, and the morphological operators can be computed
+directly on the packed words (see dilation and erosion below), as in morphology.py:
+we combine the image shifted by each element of the structuring element.
+
+The bits after the last column of each row (padding) are always kept at zero.
+'''
+class PackedBinaryImage(object):
+    def __init__(self, words, width):
+        '''
+        Constructor. Usually, the objects are created with pack_binary_image.
+
+        Args:
+            words: Array of shape (rows, words_per_row) and type uint64 with the bits of the image.
+            width: Amount of columns of the image.
+        '''
+        self.words = words
+        self.width = width
+        self.clear_padding()
+
+    @property
+    def shape(self):
+        return (self.words.shape[0], self.width)
+
+    def clear_padding(self):
+        '''
+        Set to zero the bits of the last word of each row that are after the
+        last column of the image.
+        '''
+        last_bits = self.width % 64
+        if last_bits:
+            self.words[:, -1] &= np.uint64((1 << last_bits) - 1)
+
+    def copy(self):
+        return PackedBinaryImage(self.words.copy(), self.width)
+
+    def logical_and(self, other):
+        '''
+        Pixel-wise AND between two packed images of the same shape.
+        '''
+        assert(self.shape == other.shape)
+        return PackedBinaryImage(self.words & other.words, self.width)
+
+    def logical_or(self, other):
+        '''
+        Pixel-wise OR between two packed images of the same shape.
+        '''
+        assert(self.shape == other.shape)
+        return PackedBinaryImage(self.words | other.words, self.width)
+
+    def count_nonzero(self):
+        '''
+        Amount of pixels equal to 1 in the image.
+        '''
+        return int(np.sum(np.unpackbits(self.words.view(np.uint8))))
+
+    def shifted(self, row_offset, col_offset):
+        '''
+        Create the image shifted by the given offsets: the pixel (i, j) of the
+        output is the pixel (i + row_offset, j + col_offset) of this image. The
+        pixels that fall outside the image are zeros.
+
+        Args:
+            row_offset: Integer offset in the rows direction.
+            col_offset: Integer offset in the columns direction.
+
+        Returns:
+            Shifted PackedBinaryImage, with the same shape as this one.
+        '''
+        rows, words_per_row = self.words.shape
+        output = np.zeros_like(self.words)
+
+        # We shift the rows: we only copy the rows that stay inside the image
+        if abs(row_offset) >= rows:
+            return PackedBinaryImage(output, self.width)
+        src_rows = self.words[max(row_offset, 0):rows + min(row_offset, 0)]
+        dst_start = max(-row_offset, 0)
+
+        # We shift the columns. A shift of s pixels is a shift of s // 64 entire
+        # words, plus a shift of s % 64 bits inside the words, where the bits
+        # that go out of a word enter into the neighbour word.
+        word_shift, bit_shift = divmod(abs(col_offset), 64)
+        if word_shift >= words_per_row:
+            return PackedBinaryImage(output, self.width)
+        dst = output[dst_start:dst_start + src_rows.shape[0]]
+        if col_offset >= 0:
+            # The pixel j takes the value of the pixel j + s: the bits go to
+            # lower positions
+            src = src_rows[:, word_shift:]
+            count = src.shape[1]
+            if bit_shift:
+                dst[:, :count] = src >> np.uint64(bit_shift)
+                dst[:, :count - 1] |= src[:, 1:] << np.uint64(64 - bit_shift)
+            else:
+                dst[:, :count] = src
+        else:
+            # The pixel j takes the value of the pixel j - s: the bits go to
+            # higher positions
+            src = src_rows[:, :words_per_row - word_shift]
+            if bit_shift:
+                dst[:, word_shift:] = src << np.uint64(bit_shift)
+                dst[:, word_shift + 1:] |= src[:, :-1] >> np.uint64(64 - bit_shift)
+            else:
+                dst[:, word_shift:] = src
+
+        return PackedBinaryImage(output, self.width)
+
+    def unpack(self):
+        '''
+        Convert the packed image into a binary image coded in 8-bits.
+
+        Returns:
+            Binary image with only 0s and 1s, coded in 8-bits.
+        '''
+        as_bytes = self.words.astype('<u8').view(np.uint8)
+        return np.unpackbits(as_bytes, axis=1, count=self.width, bitorder='little')
+
+def pack_binary_image(img):
+    '''
+    Pack a binary image in bits. Any pixel different to zero is considered as 1.
+
+    Args:
+        img: Binary input image (The only possible values are 0 and 1).
+
+    Returns:
+        PackedBinaryImage with the same shape as the input image.
+    '''
+    img = np.asarray(img)
+    rows, cols = img.shape
+    # We pack each row in bytes, and we add zero bytes at the end of the rows
+    # to have an amount of bytes multiple of 8. This way, each group of 8 bytes
+    # can be seen as a 64-bits word.
+    words_per_row = (cols + 63) // 64
+    as_bytes = np.zeros((rows, 8 * words_per_row), dtype=np.uint8)
+    packed_row = np.packbits(img != 0, axis=1, bitorder='little')
+    as_bytes[:, :packed_row.shape[1]] = packed_row
+    words = as_bytes.view('<u8').astype(np.uint64)
+    return PackedBinaryImage(words, cols)
+
+def dilation(packed_img, kernel):
+    '''
+    Apply the morphological operator DILATION to a packed image: the OR of the
+    image shifted by each element of the structuring element. The image is
+    considered to be surrounded by zeros.
+
+    Args:
+        packed_img: PackedBinaryImage to dilate.
+        kernel: Structuring element. IMPORTANT: The size of the kernel must be
+            an odd number (3, 5, 7, etc).
+
+    Returns:
+        Dilated PackedBinaryImage.
+    '''
+    kernel = np.asarray(kernel)
+    assert(kernel.shape[0] % 2 and kernel.shape[1] % 2)
+    center_row = kernel.shape[0] // 2
+    center_col = kernel.shape[1] // 2
+
+    output = PackedBinaryImage(np.zeros_like(packed_img.words), packed_img.width)
+    for i, j in zip(*np.nonzero(kernel)):
+        output.words |= packed_img.shifted(i - center_row, j - center_col).words
+    return output
+
+def erosion(packed_img, kernel):
+    '''
+    Apply the morphological operator EROSION to a packed image: the AND of the
+    image shifted by each element of the structuring element. The image is
+    considered to be surrounded by zeros.
+
+    Args:
+        packed_img: PackedBinaryImage to erode.
+        kernel: Structuring element. IMPORTANT: The size of the kernel must be
+            an odd number (3, 5, 7, etc).
+
+    Returns:
+        Eroded PackedBinaryImage.
+    '''
+    kernel = np.asarray(kernel)
+    assert(kernel.shape[0] % 2 and kernel.shape[1] % 2)
+    center_row = kernel.shape[0] // 2
+    center_col = kernel.shape[1] // 2
+
+    output = PackedBinaryImage(np.full_like(packed_img.words, np.iinfo(np.uint64).max), packed_img.width)
+    for i, j in zip(*np.nonzero(kernel)):
+        output.words &= packed_img.shifted(i - center_row, j - center_col).words
+    return output
+
+def opening(packed_img, kernel):
+    '''
+    Apply the opening operation (erosion followed by dilation) to a packed image.
+    '''
+    return dilation(erosion(packed_img, kernel), kernel)
+
+def closing(packed_img, kernel):
+    '''
+    Apply the closing operation (dilation followed by erosion) to a packed image.
+    '''
+    return erosion(dilation(packed_img, kernel), kernel)
@@ -1,721 +0,0 @@
-hsv_label_colors = [
-    [0, 100, 255],
-    [0, 150, 200],
-    [0, 200, 180],
-    [0, 255, 100],
-    [1, 100, 255],
-    [1, 150, 200],
-    [1, 200, 180],
-    [1, 255, 100],
-    [2, 100, 255],
-    [2, 150, 200],
-    [2, 200, 180],
-    [2, 255, 100],
-    [3, 100, 255],
-    [3, 150, 200],
-    [3, 200, 180],
-    [3, 255, 100],
-    [4, 100, 255],
-    [4, 150, 200],
-    [4, 200, 180],
-    [4, 255, 100],
-    [5, 100, 255],
-    [5, 150, 200],
-    [5, 200, 180],
-    [5, 255, 100],
-    [6, 100, 255],
-    [6, 150, 200],
-    [6, 200, 180],
-    [6, 255, 100],
-    [7, 100, 255],
-    [7, 150, 200],
-    [7, 200, 180],
-    [7, 255, 100],
-    [8, 100, 255],
-    [8, 150, 200],
-    [8, 200, 180],
-    [8, 255, 100],
-    [9, 100, 255],
-    [9, 150, 200],
-    [9, 200, 180],
-    [9, 255, 100],
-    [10, 100, 255],
-    [10, 150, 200],
-    [10, 200, 180],
-    [10, 255, 100],
-    [11, 100, 255],
-    [11, 150, 200],
-    [11, 200, 180],
-    [11, 255, 100],
-    [12, 100, 255],
-    [12, 150, 200],
-    [12, 200, 180],
-    [12, 255, 100],
-    [13, 100, 255],
-    [13, 150, 200],
-    [13, 200, 180],
-    [13, 255, 100],
-    [14, 100, 255],
-    [14, 150, 200],
-    [14, 200, 180],
-    [14, 255, 100],
-    [15, 100, 255],
-    [15, 150, 200],
-    [15, 200, 180],
-    [15, 255, 100],
-    [16, 100, 255],
-    [16, 150, 200],
-    [16, 200, 180],
-    [16, 255, 100],
-    [17, 100, 255],
-    [17, 150, 200],
-    [17, 200, 180],
-    [17, 255, 100],
-    [18, 100, 255],
-    [18, 150, 200],
-    [18, 200, 180],
-    [18, 255, 100],
-    [19, 100, 255],
-    [19, 150, 200],
-    [19, 200, 180],
-    [19, 255, 100],
-    [20, 100, 255],
-    [20, 150, 200],
-    [20, 200, 180],
-    [20, 255, 100],
-    [21, 100, 255],
-    [21, 150, 200],
-    [21, 200, 180],
-    [21, 255, 100],
-    [22, 100, 255],
-    [22, 150, 200],
-    [22, 200, 180],
-    [22, 255, 100],
-    [23, 100, 255],
-    [23, 150, 200],
-    [23, 200, 180],
-    [23, 255, 100],
-    [24, 100, 255],
-    [24, 150, 200],
-    [24, 200, 180],
-    [24, 255, 100],
-    [25, 100, 255],
-    [25, 150, 200],
-    [25, 200, 180],
-    [25, 255, 100],
-    [26, 100, 255],
-    [26, 150, 200],
-    [26, 200, 180],
-    [26, 255, 100],
-    [27, 100, 255],
-    [27, 150, 200],
-    [27, 200, 180],
-    [27, 255, 100],
-    [28, 100, 255],
-    [28, 150, 200],
-    [28, 200, 180],
-    [28, 255, 100],
-    [29, 100, 255],
-    [29, 150, 200],
-    [29, 200, 180],
-    [29, 255, 100],
-    [30, 100, 255],
-    [30, 150, 200],
-    [30, 200, 180],
-    [30, 255, 100],
-    [31, 100, 255],
-    [31, 150, 200],
-    [31, 200, 180],
-    [31, 255, 100],
-    [32, 100, 255],
-    [32, 150, 200],
-    [32, 200, 180],
-    [32, 255, 100],
-    [33, 100, 255],
-    [33, 150, 200],
-    [33, 200, 180],
-    [33, 255, 100],
-    [34, 100, 255],
-    [34, 150, 200],
-    [34, 200, 180],
-    [34, 255, 100],
-    [35, 100, 255],
-    [35, 150, 200],
-    [35, 200, 180],
-    [35, 255, 100],
-    [36, 100, 255],
-    [36, 150, 200],
-    [36, 200, 180],
-    [36, 255, 100],
-    [37, 100, 255],
-    [37, 150, 200],
-    [37, 200, 180],
-    [37, 255, 100],
-    [38, 100, 255],
-    [38, 150, 200],
-    [38, 200, 180],
-    [38, 255, 100],
-    [39, 100, 255],
-    [39, 150, 200],
-    [39, 200, 180],
-    [39, 255, 100],
-    [40, 100, 255],
-    [40, 150, 200],
-    [40, 200, 180],
-    [40, 255, 100],
-    [41, 100, 255],
-    [41, 150, 200],
-    [41, 200, 180],
-    [41, 255, 100],
-    [42, 100, 255],
-    [42, 150, 200],
-    [42, 200, 180],
-    [42, 255, 100],
-    [43, 100, 255],
-    [43, 150, 200],
-    [43, 200, 180],
-    [43, 255, 100],
-    [44, 100, 255],
-    [44, 150, 200],
-    [44, 200, 180],
-    [44, 255, 100],
-    [45, 100, 255],
-    [45, 150, 200],
-    [45, 200, 180],
-    [45, 255, 100],
-    [46, 100, 255],
-    [46, 150, 200],
-    [46, 200, 180],
-    [46, 255, 100],
-    [47, 100, 255],
-    [47, 150, 200],
-    [47, 200, 180],
-    [47, 255, 100],
-    [48, 100, 255],
-    [48, 150, 200],
-    [48, 200, 180],
-    [48, 255, 100],
-    [49, 100, 255],
-    [49, 150, 200],
-    [49, 200, 180],
-    [49, 255, 100],
-    [50, 100, 255],
-    [50, 150, 200],
-    [50, 200, 180],
-    [50, 255, 100],
-    [51, 100, 255],
-    [51, 150, 200],
-    [51, 200, 180],
-    [51, 255, 100],
-    [52, 100, 255],
-    [52, 150, 200],
-    [52, 200, 180],
-    [52, 255, 100],
-    [53, 100, 255],
-    [53, 150, 200],
-    [53, 200, 180],
-    [53, 255, 100],
-    [54, 100, 255],
-    [54, 150, 200],
-    [54, 200, 180],
-    [54, 255, 100],
-    [55, 100, 255],
-    [55, 150, 200],
-    [55, 200, 180],
-    [55, 255, 100],
-    [56, 100, 255],
-    [56, 150, 200],
-    [56, 200, 180],
-    [56, 255, 100],
-    [57, 100, 255],
-    [57, 150, 200],
-    [57, 200, 180],
-    [57, 255, 100],
-    [58, 100, 255],
-    [58, 150, 200],
-    [58, 200, 180],
-    [58, 255, 100],
-    [59, 100, 255],
-    [59, 150, 200],
-    [59, 200, 180],
-    [59, 255, 100],
-    [60, 100, 255],
-    [60, 150, 200],
-    [60, 200, 180],
-    [60, 255, 100],
-    [61, 100, 255],
-    [61, 150, 200],
-    [61, 200, 180],
-    [61, 255, 100],
-    [62, 100, 255],
-    [62, 150, 200],
-    [62, 200, 180],
-    [62, 255, 100],
-    [63, 100, 255],
-    [63, 150, 200],
-    [63, 200, 180],
-    [63, 255, 100],
-    [64, 100, 255],
-    [64, 150, 200],
-    [64, 200, 180],
-    [64, 255, 100],
-    [65, 100, 255],
-    [65, 150, 200],
-    [65, 200, 180],
-    [65, 255, 100],
-    [66, 100, 255],
-    [66, 150, 200],
-    [66, 200, 180],
-    [66, 255, 100],
-    [67, 100, 255],
-    [67, 150, 200],
-    [67, 200, 180],
-    [67, 255, 100],
-    [68, 100, 255],
-    [68, 150, 200],
-    [68, 200, 180],
-    [68, 255, 100],
-    [69, 100, 255],
-    [69, 150, 200],
-    [69, 200, 180],
-    [69, 255, 100],
-    [70, 100, 255],
-    [70, 150, 200],
-    [70, 200, 180],
-    [70, 255, 100],
-    [71, 100, 255],
-    [71, 150, 200],
-    [71, 200, 180],
-    [71, 255, 100],
-    [72, 100, 255],
-    [72, 150, 200],
-    [72, 200, 180],
-    [72, 255, 100],
-    [73, 100, 255],
-    [73, 150, 200],
-    [73, 200, 180],
-    [73, 255, 100],
-    [74, 100, 255],
-    [74, 150, 200],
-    [74, 200, 180],
-    [74, 255, 100],
-    [75, 100, 255],
-    [75, 150, 200],
-    [75, 200, 180],
-    [75, 255, 100],
-    [76, 100, 255],
-    [76, 150, 200],
-    [76, 200, 180],
-    [76, 255, 100],
-    [77, 100, 255],
-    [77, 150, 200],
-    [77, 200, 180],
-    [77, 255, 100],
-    [78, 100, 255],
-    [78, 150, 200],
-    [78, 200, 180],
-    [78, 255, 100],
-    [79, 100, 255],
-    [79, 150, 200],
-    [79, 200, 180],
-    [79, 255, 100],
-    [80, 100, 255],
-    [80, 150, 200],
-    [80, 200, 180],
-    [80, 255, 100],
-    [81, 100, 255],
-    [81, 150, 200],
-    [81, 200, 180],
-    [81, 255, 100],
-    [82, 100, 255],
-    [82, 150, 200],
-    [82, 200, 180],
-    [82, 255, 100],
-    [83, 100, 255],
-    [83, 150, 200],
-    [83, 200, 180],
-    [83, 255, 100],
-    [84, 100, 255],
-    [84, 150, 200],
-    [84, 200, 180],
-    [84, 255, 100],
-    [85, 100, 255],
-    [85, 150, 200],
-    [85, 200, 180],
-    [85, 255, 100],
-    [86, 100, 255],
-    [86, 150, 200],
-    [86, 200, 180],
-    [86, 255, 100],
-    [87, 100, 255],
-    [87, 150, 200],
-    [87, 200, 180],
-    [87, 255, 100],
-    [88, 100, 255],
-    [88, 150, 200],
-    [88, 200, 180],
-    [88, 255, 100],
-    [89, 100, 255],
-    [89, 150, 200],
-    [89, 200, 180],
-    [89, 255, 100],
-    [90, 100, 255],
-    [90, 150, 200],
-    [90, 200, 180],
-    [90, 255, 100],
-    [91, 100, 255],
-    [91, 150, 200],
-    [91, 200, 180],
-    [91, 255, 100],
-    [92, 100, 255],
-    [92, 150, 200],
-    [92, 200, 180],
-    [92, 255, 100],
-    [93, 100, 255],
-    [93, 150, 200],
-    [93, 200, 180],
-    [93, 255, 100],
-    [94, 100, 255],
-    [94, 150, 200],
-    [94, 200, 180],
-    [94, 255, 100],
-    [95, 100, 255],
-    [95, 150, 200],
-    [95, 200, 180],
-    [95, 255, 100],
-    [96, 100, 255],
-    [96, 150, 200],
-    [96, 200, 180],
-    [96, 255, 100],
-    [97, 100, 255],
-    [97, 150, 200],
-    [97, 200, 180],
-    [97, 255, 100],
-    [98, 100, 255],
-    [98, 150, 200],
-    [98, 200, 180],
-    [98, 255, 100],
-    [99, 100, 255],
-    [99, 150, 200],
-    [99, 200, 180],
-    [99, 255, 100],
-    [100, 100, 255],
-    [100, 150, 200],
-    [100, 200, 180],
-    [100, 255, 100],
-    [101, 100, 255],
-    [101, 150, 200],
-    [101, 200, 180],
-    [101, 255, 100],
-    [102, 100, 255],
-    [102, 150, 200],
-    [102, 200, 180],
-    [102, 255, 100],
-    [103, 100, 255],
-    [103, 150, 200],
-    [103, 200, 180],
-    [103, 255, 100],
-    [104, 100, 255],
-    [104, 150, 200],
-    [104, 200, 180],
-    [104, 255, 100],
-    [105, 100, 255],
-    [105, 150, 200],
-    [105, 200, 180],
-    [105, 255, 100],
-    [106, 100, 255],
-    [106, 150, 200],
-    [106, 200, 180],
-    [106, 255, 100],
-    [107, 100, 255],
-    [107, 150, 200],
-    [107, 200, 180],
-    [107, 255, 100],
-    [108, 100, 255],
-    [108, 150, 200],
-    [108, 200, 180],
-    [108, 255, 100],
-    [109, 100, 255],
-    [109, 150, 200],
-    [109, 200, 180],
-    [109, 255, 100],
-    [110, 100, 255],
-    [110, 150, 200],
-    [110, 200, 180],
-    [110, 255, 100],
-    [111, 100, 255],
-    [111, 150, 200],
-    [111, 200, 180],
-    [111, 255, 100],
-    [112, 100, 255],
-    [112, 150, 200],
-    [112, 200, 180],
-    [112, 255, 100],
-    [113, 100, 255],
-    [113, 150, 200],
-    [113, 200, 180],
-    [113, 255, 100],
-    [114, 100, 255],
-    [114, 150, 200],
-    [114, 200, 180],
-    [114, 255, 100],
-    [115, 100, 255],
-    [115, 150, 200],
-    [115, 200, 180],
-    [115, 255, 100],
-    [116, 100, 255],
-    [116, 150, 200],
-    [116, 200, 180],
-    [116, 255, 100],
-    [117, 100, 255],
-    [117, 150, 200],
-    [117, 200, 180],
-    [117, 255, 100],
-    [118, 100, 255],
-    [118, 150, 200],
-    [118, 200, 180],
-    [118, 255, 100],
-    [119, 100, 255],
-    [119, 150, 200],
-    [119, 200, 180],
-    [119, 255, 100],
-    [120, 100, 255],
-    [120, 150, 200],
-    [120, 200, 180],
-    [120, 255, 100],
-    [121, 100, 255],
-    [121, 150, 200],
-    [121, 200, 180],
-    [121, 255, 100],
-    [122, 100, 255],
-    [122, 150, 200],
-    [122, 200, 180],
-    [122, 255, 100],
-    [123, 100, 255],
-    [123, 150, 200],
-    [123, 200, 180],
-    [123, 255, 100],
-    [124, 100, 255],
-    [124, 150, 200],
-    [124, 200, 180],
-    [124, 255, 100],
-    [125, 100, 255],
-    [125, 150, 200],
-    [125, 200, 180],
-    [125, 255, 100],
-    [126, 100, 255],
-    [126, 150, 200],
-    [126, 200, 180],
-    [126, 255, 100],
-    [127, 100, 255],
-    [127, 150, 200],
-    [127, 200, 180],
-    [127, 255, 100],
-    [128, 100, 255],
-    [128, 150, 200],
-    [128, 200, 180],
-    [128, 255, 100],
-    [129, 100, 255],
-    [129, 150, 200],
-    [129, 200, 180],
-    [129, 255, 100],
-    [130, 100, 255],
-    [130, 150, 200],
-    [130, 200, 180],
-    [130, 255, 100],
-    [131, 100, 255],
-    [131, 150, 200],
-    [131, 200, 180],
-    [131, 255, 100],
-    [132, 100, 255],
-    [132, 150, 200],
-    [132, 200, 180],
-    [132, 255, 100],
-    [133, 100, 255],
-    [133, 150, 200],
-    [133, 200, 180],
-    [133, 255, 100],
-    [134, 100, 255],
-    [134, 150, 200],
-    [134, 200, 180],
-    [134, 255, 100],
-    [135, 100, 255],
-    [135, 150, 200],
-    [135, 200, 180],
-    [135, 255, 100],
-    [136, 100, 255],
-    [136, 150, 200],
-    [136, 200, 180],
-    [136, 255, 100],
-    [137, 100, 255],
-    [137, 150, 200],
-    [137, 200, 180],
-    [137, 255, 100],
-    [138, 100, 255],
-    [138, 150, 200],
-    [138, 200, 180],
-    [138, 255, 100],
-    [139, 100, 255],
-    [139, 150, 200],
-    [139, 200, 180],
-    [139, 255, 100],
-    [140, 100, 255],
-    [140, 150, 200],
-    [140, 200, 180],
-    [140, 255, 100],
-    [141, 100, 255],
-    [141, 150, 200],
-    [141, 200, 180],
-    [141, 255, 100],
-    [142, 100, 255],
-    [142, 150, 200],
-    [142, 200, 180],
-    [142, 255, 100],
-    [143, 100, 255],
-    [143, 150, 200],
-    [143, 200, 180],
-    [143, 255, 100],
-    [144, 100, 255],
-    [144, 150, 200],
-    [144, 200, 180],
-    [144, 255, 100],
-    [145, 100, 255],
-    [145, 150, 200],
-    [145, 200, 180],
-    [145, 255, 100],
-    [146, 100, 255],
-    [146, 150, 200],
-    [146, 200, 180],
-    [146, 255, 100],
-    [147, 100, 255],
-    [147, 150, 200],
-    [147, 200, 180],
-    [147, 255, 100],
-    [148, 100, 255],
-    [148, 150, 200],
-    [148, 200, 180],
-    [148, 255, 100],
-    [149, 100, 255],
-    [149, 150, 200],
-    [149, 200, 180],
-    [149, 255, 100],
-    [150, 100, 255],
-    [150, 150, 200],
-    [150, 200, 180],
-    [150, 255, 100],
-    [151, 100, 255],
-    [151, 150, 200],
-    [151, 200, 180],
-    [151, 255, 100],
-    [152, 100, 255],
-    [152, 150, 200],
-    [152, 200, 180],
-    [152, 255, 100],
-    [153, 100, 255],
-    [153, 150, 200],
-    [153, 200, 180],
-    [153, 255, 100],
-    [154, 100, 255],
-    [154, 150, 200],
-    [154, 200, 180],
-    [154, 255, 100],
-    [155, 100, 255],
-    [155, 150, 200],
-    [155, 200, 180],
-    [155, 255, 100],
-    [156, 100, 255],
-    [156, 150, 200],
-    [156, 200, 180],
-    [156, 255, 100],
-    [157, 100, 255],
-    [157, 150, 200],
-    [157, 200, 180],
-    [157, 255, 100],
-    [158, 100, 255],
-    [158, 150, 200],
-    [158, 200, 180],
-    [158, 255, 100],
-    [159, 100, 255],
-    [159, 150, 200],
-    [159, 200, 180],
-    [159, 255, 100],
-    [160, 100, 255],
-    [160, 150, 200],
-    [160, 200, 180],
-    [160, 255, 100],
-    [161, 100, 255],
-    [161, 150, 200],
-    [161, 200, 180],
-    [161, 255, 100],
-    [162, 100, 255],
-    [162, 150, 200],
-    [162, 200, 180],
-    [162, 255, 100],
-    [163, 100, 255],
-    [163, 150, 200],
-    [163, 200, 180],
-    [163, 255, 100],
-    [164, 100, 255],
-    [164, 150, 200],
-    [164, 200, 180],
-    [164, 255, 100],
-    [165, 100, 255],
-    [165, 150, 200],
-    [165, 200, 180],
-    [165, 255, 100],
-    [166, 100, 255],
-    [166, 150, 200],
-    [166, 200, 180],
-    [166, 255, 100],
-    [167, 100, 255],
-    [167, 150, 200],
-    [167, 200, 180],
-    [167, 255, 100],
-    [168, 100, 255],
-    [168, 150, 200],
-    [168, 200, 180],
-    [168, 255, 100],
-    [169, 100, 255],
-    [169, 150, 200],
-    [169, 200, 180],
-    [169, 255, 100],
-    [170, 100, 255],
-    [170, 150, 200],
-    [170, 200, 180],
-    [170, 255, 100],
-    [171, 100, 255],
-    [171, 150, 200],
-    [171, 200, 180],
-    [171, 255, 100],
-    [172, 100, 255],
-    [172, 150, 200],
-    [172, 200, 180],
-    [172, 255, 100],
-    [173, 100, 255],
-    [173, 150, 200],
-    [173, 200, 180],
-    [173, 255, 100],
-    [174, 100, 255],
-    [174, 150, 200],
-    [174, 200, 180],
-    [174, 255, 100],
-    [175, 100, 255],
-    [175, 150, 200],
-    [175, 200, 180],
-    [175, 255, 100],
-    [176, 100, 255],
-    [176, 150, 200],
-    [176, 200, 180],
-    [176, 255, 100],
-    [177, 100, 255],
-    [177, 150, 200],
-    [177, 200, 180],
-    [177, 255, 100],
-    [178, 100, 255],
-    [178, 150, 200],
-    [178, 200, 180],
-    [178, 255, 100],
-    [179, 100, 255],
-    [179, 150, 200],
-    [179, 200, 180],
-    [179, 255, 100]]
\ No newline at end of file
@@ -0,0 +1,374 @@
+import numpy as np
+
+'''
+Connected-components labeling that computes the statistics of each component
+(area, bounding box, mass center and central moments up to order 2) during the
+labeling itself, so nobody has to go over the pixels of the components again.
+
+The algorithm works with runs: groups of consecutive pixels equal to 1 in the
+same row. Each run is given by its row, the column where it starts, and the
+column where it ends (this last column is not included, as in Python slices).
+    1) We find all the runs of the image.
+    2) Two runs of consecutive rows belong to the same component if they touch
+        each other (4-connected), or if they touch each other or a diagonal (8-connected).
+        We join these runs with a union-find structure.
+    3) The statistics of a run can be computed directly from its row and its first
+        and last columns (for example, the sum of the columns is the sum of an
+        arithmetic series), so the statistics of a component are the sums of the
+        statistics of its runs.
+
+The image can be given by strips of rows (see StreamingLabeler). Only the runs
+of the last row of the previous strip are kept, so images that do not fit in
+memory can be labeled strip by strip.
+
+As in cv2.connectedComponents, the label 0 is the background, and the components
+are numbered in the order in which they appear when we read the image row by row.
+'''
+
+# Names of the values accumulated for each component
+ACCUMULATED_SUMS = ['area', 'sum_row', 'sum_col', 'sum_row2', 'sum_col2', 'sum_row_col']
+
+def get_runs(binary, first_row=0):
+    '''
+    Find the runs (groups of consecutive pixels equal to 1 in a row) of a binary image.
+
+    Args:
+        binary: Binary image (any value different to zero is 1).
+        first_row (optional): Row of the full image that corresponds to the first
+            row of this image (used when the image is a strip of a bigger image).
+
+    Returns:
+        Tuple with three arrays, with one element per run, sorted row by row:
+        the rows, the first column and the last column + 1 of each run.
+    '''
+    binary = np.asarray(binary) != 0
+    rows, cols = binary.shape
+    # We add a zero column at each side, so each run starts with a change 0 -> 1
+    # and ends with a change 1 -> 0.
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = binary
+    changes = np.diff(padded, axis=1)
+    run_rows, starts = np.nonzero(changes == 1)
+    _, ends = np.nonzero(changes == -1)
+    return run_rows + first_row, starts, ends
+
+def get_touching_runs(rows, starts, ends, width, connectivity):
+    '''
+    Find the pairs of runs of consecutive rows that touch each other.
+
+    To do it without travelling over the runs one by one, each run is given a key
+    row * (width + 2) + column. Since the runs are sorted row by row, the keys of
+    their starts and ends are sorted too, and the runs of the previous row that
+    touch a given run can be found with a binary search (np.searchsorted).
+
+    Args:
+        rows, starts, ends: Runs, sorted row by row (see get_runs).
+        width: Amount of columns of the image.
+        connectivity: 4 or 8.
+
+    Returns:
+        Tuple with two arrays: the index of the run in the upper row, and the
+        index of the run in the lower row, for each pair of runs that touch.
+    '''
+    assert(connectivity == 4 or connectivity == 8)
+    # With 8-connectivity, the runs that touch by a diagonal are also joined
+    extra = 1 if connectivity == 8 else 0
+    row_size = width + 2
+    start_keys = rows * row_size + starts
+    end_keys = rows * row_size + ends
+
+    # The upper run a touches the lower run b if a ends after b starts, and a
+    # starts before b ends (with one pixel more for the diagonals).
+    previous_row = (rows - 1) * row_size
+    first = np.searchsorted(end_keys, previous_row + starts - extra, side='right')
+    last = np.searchsorted(start_keys, previous_row + ends + extra, side='left')
+
+    counts = np.maximum(last - first, 0)
+    lower = np.repeat(np.arange(len(rows)), counts)
+    # For each lower run, the upper runs are first, first + 1, ..., last - 1
+    offsets = np.arange(len(lower)) - np.repeat(np.cumsum(counts) - counts, counts)
+    upper = np.repeat(first, counts) + offsets
+    return upper, lower
+
+def join_pairs(amount, first, second):
+    '''
+    Union-find over the elements 0..amount-1: join the elements of each pair
+    (first[k], second[k]), and find the root of each element. The root of each
+    group is its smallest element.
+
+    Instead of joining the pairs one by one, all the pairs are processed at once:
+    the root of each pair takes the smallest of the two roots, and then we
+    compress the paths (each element points to the root of its parent) until
+    nothing changes. This is repeated until all the pairs have the same root.
+
+    Args:
+        amount: Amount of elements.
+        first, second: Arrays with the elements of each pair.
+
+    Returns:
+        Array with the root of each element.
+    '''
+    parent = np.arange(amount)
+    if len(first) == 0:
+        return parent
+    while True:
+        root_first = parent[first]
+        root_second = parent[second]
+        if np.array_equal(root_first, root_second):
+            return parent
+        smallest = np.minimum(root_first, root_second)
+        np.minimum.at(parent, root_first, smallest)
+        np.minimum.at(parent, root_second, smallest)
+        # Path compression: we repeat until each element points to its root
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                break
+            parent = grand_parent
+
+def get_runs_sums(rows, starts, ends, run_labels, amount_labels):
+    '''
+    Compute, for each label, the sums needed for the statistics, using only the runs.
+
+    For a run in the row r, from the column s until the column e - 1, with n = e - s pixels:
+        sum of columns = n * (s + e - 1) / 2
+        sum of squared columns = S2(e - 1) - S2(s - 1), with S2(x) = x (x + 1) (2x + 1) / 6
+        sum of rows = r * n, sum of squared rows = r^2 * n, sum of rows * columns = r * sum of columns
+
+    Args:
+        rows, starts, ends: Runs (see get_runs).
+        run_labels: Label of each run.
+        amount_labels: Amount of labels.
+
+    Returns:
+        Dictionary with one array (one value per label) for each name in ACCUMULATED_SUMS,
+        and the bounding boxes: 'min_row', 'max_row', 'min_col' and 'max_col'.
+    '''
+    rows = rows.astype(np.float64)
+    first = starts.astype(np.float64)
+    last = ends.astype(np.float64) - 1
+    lengths = last - first + 1
+    sum_col = lengths * (first + last) / 2.0
+    sum_col2 = (last * (last + 1) * (2 * last + 1) - (first - 1) * first * (2 * first - 1)) / 6.0
+
+    run_values = {
+        'area': lengths,
+        'sum_row': rows * lengths,
+        'sum_col': sum_col,
+        'sum_row2': rows * rows * lengths,
+        'sum_col2': sum_col2,
+        'sum_row_col': rows * sum_col,
+    }
+    sums = {}
+    for name in ACCUMULATED_SUMS:
+        sums[name] = np.bincount(run_labels, weights=run_values[name], minlength=amount_labels)
+
+    # Bounding box: the runs are sorted row by row, so we only have to compare
+    # with the previous values.
+    big = np.iinfo(np.int64).max
+    sums['min_row'] = np.full(amount_labels, big, dtype=np.int64)
+    sums['max_row'] = np.full(amount_labels, -1, dtype=np.int64)
+    sums['min_col'] = np.full(amount_labels, big, dtype=np.int64)
+    sums['max_col'] = np.full(amount_labels, -1, dtype=np.int64)
+    np.minimum.at(sums['min_row'], run_labels, rows.astype(np.int64))
+    np.maximum.at(sums['max_row'], run_labels, rows.astype(np.int64))
+    np.minimum.at(sums['min_col'], run_labels, starts)
+    np.maximum.at(sums['max_col'], run_labels, ends - 1)
+    return sums
+
+def get_stats_from_sums(sums):
+    '''
+    Compute the statistics of each component from the accumulated sums.
+
+    Args:
+        sums: Dictionary created by get_runs_sums (or the sum of several of them).
+
+    Returns:
+        Dictionary with one array per statistic, with one value per label:
+            area, min_row, max_row, min_col, max_col (bounding box, included),
+            mass_center_row, mass_center_col,
+            moment_2_0, moment_0_2, moment_1_1 (central moments, as in Particle),
+            and the raw sums sum_row, sum_col, sum_row2, sum_col2, sum_row_col.
+    '''
+    stats = dict(sums)
+    area = sums['area']
+    # We avoid the division by zero for the background, which has no runs
+    safe_area = np.where(area > 0, area, 1)
+    stats['mass_center_row'] = sums['sum_row'] / safe_area
+    stats['mass_center_col'] = sums['sum_col'] / safe_area
+    stats['moment_2_0'] = sums['sum_row2'] - sums['sum_row'] * stats['mass_center_row']
+    stats['moment_0_2'] = sums['sum_col2'] - sums['sum_col'] * stats['mass_center_col']
+    stats['moment_1_1'] = sums['sum_row_col'] - sums['sum_row'] * stats['mass_center_col']
+    empty = area == 0
+    for name in ['min_row', 'max_row', 'min_col', 'max_col']:
+        stats[name] = np.where(empty, 0, sums[name])
+    return stats
+
+'''
+This class labels a binary image given strip by strip (groups of consecutive
+rows, from top to bottom), and it accumulates the statistics of the components.
+
+Each component found in a strip gets a provisional label. When a component of
+a strip touches a component of the previous strip, we remember that both
+provisional labels are the same component. At the end (see finish), the
+provisional labels are joined, and the final labels are assigned.
+'''
+class StreamingLabeler(object):
+    def __init__(self, width, connectivity=8):
+        '''
+        Constructor.
+
+        Args:
+            width: Amount of columns of the image.
+            connectivity (optional): 4 or 8.
+        '''
+        assert(connectivity == 4 or connectivity == 8)
+        self.width = width
+        self.connectivity = connectivity
+        self.next_row = 0
+        self.amount_provisional = 0
+        # Runs of the last row of the previous strip, and their provisional labels
+        self.last_runs = (np.zeros(0, dtype=np.int64),) * 3
+        self.last_labels = np.zeros(0, dtype=np.int64)
+        # Pairs of provisional labels that belong to the same component
+        self.joined = []
+        # Sums of each strip (see get_runs_sums)
+        self.strip_sums = []
+
+    def add_strip(self, strip):
+        '''
+        Label a new strip of the image, just below the previous one.
+
+        Args:
+            strip: Binary image with the rows of the strip.
+
+        Returns:
+            Tuple with the runs of the strip (rows, starts and ends, see get_runs)
+            and their provisional labels.
+        '''
+        strip = np.asarray(strip)
+        assert(strip.shape[1] == self.width)
+        rows, starts, ends = get_runs(strip, self.next_row)
+        self.next_row += strip.shape[0]
+
+        # We add the runs of the last row of the previous strip at the beginning,
+        # so we can find which runs of this strip touch them.
+        amount_last = len(self.last_labels)
+        all_rows = np.concatenate((self.last_runs[0], rows))
+        all_starts = np.concatenate((self.last_runs[1], starts))
+        all_ends = np.concatenate((self.last_runs[2], ends))
+        upper, lower = get_touching_runs(all_rows, all_starts, all_ends, self.width, self.connectivity)
+        roots = join_pairs(len(all_rows), upper, lower)
+
+        # We give a provisional label to each component of this strip. We number
+        # the components by their root, which is their first run.
+        unique_roots, run_components = np.unique(roots, return_inverse=True)
+        run_components = run_components.reshape(-1)
+        provisional = self.amount_provisional + np.arange(len(unique_roots))
+        self.amount_provisional += len(unique_roots)
+        run_labels = provisional[run_components]
+
+        # The runs of the previous strip keep their own label, so we remember
+        # that it is the same component as the new provisional label.
+        if amount_last:
+            self.joined.append((self.last_labels, run_labels[:amount_last]))
+        run_labels = run_labels[amount_last:]
+
+        # We accumulate the sums of the runs of this strip, by provisional label
+        first_label = provisional[0] if len(provisional) else self.amount_provisional
+        sums = get_runs_sums(rows, starts, ends, run_labels - first_label, len(provisional))
+        self.strip_sums.append(sums)
+
+        # We keep the runs of the last row of this strip for the next strip
+        in_last_row = rows == self.next_row - 1
+        self.last_runs = (rows[in_last_row], starts[in_last_row], ends[in_last_row])
+        self.last_labels = run_labels[in_last_row]
+        return rows, starts, ends, run_labels
+
+    def finish(self):
+        '''
+        Join the provisional labels that belong to the same component, and compute
+        the statistics of each component.
+
+        Returns:
+            Tuple with three elements: the amount of labels (background included),
+            the dictionary with the statistics (see get_stats_from_sums), and a LUT
+            that converts each provisional label into its final label.
+        '''
+        if self.joined:
+            first = np.concatenate([pair[0] for pair in self.joined])
+            second = np.concatenate([pair[1] for pair in self.joined])
+        else:
+            first = second = np.zeros(0, dtype=np.int64)
+        roots = join_pairs(self.amount_provisional, first, second)
+        # The final labels start at 1 (0 is the background), in the order of the roots
+        unique_roots, final_labels = np.unique(roots, return_inverse=True)
+        final_labels = final_labels.reshape(-1) + 1
+        amount_labels = len(unique_roots) + 1
+
+        # We add the sums of the provisional labels that are the same component
+        sums = {}
+        if self.strip_sums:
+            all_sums = {}
+            for name in self.strip_sums[0]:
+                all_sums[name] = np.concatenate([strip[name] for strip in self.strip_sums])
+        for name in ACCUMULATED_SUMS:
+            sums[name] = np.zeros(amount_labels)
+            if self.strip_sums:
+                np.add.at(sums[name], final_labels, all_sums[name])
+        for name, func, initial in [('min_row', np.minimum, np.iinfo(np.int64).max),
+                ('max_row', np.maximum, -1),
+                ('min_col', np.minimum, np.iinfo(np.int64).max),
+                ('max_col', np.maximum, -1)]:
+            sums[name] = np.full(amount_labels, initial, dtype=np.int64)
+            if self.strip_sums:
+                func.at(sums[name], final_labels, all_sums[name])
+
+        return amount_labels, get_stats_from_sums(sums), final_labels
+
+def connected_components_with_moments(binary, connectivity=8):
+    '''
+    Label a binary image, and compute the statistics of each component, as
+    cv2.connectedComponentsWithStats does, adding the central moments of order 2.
+
+    Args:
+        binary: Binary image (only zeros and 1s).
+        connectivity (optional): 4 or 8.
+
+    Returns:
+        Tuple with three elements: the amount of labels (background included),
+        the labeled image (int32), and the dictionary with the statistics
+        (see get_stats_from_sums).
+    '''
+    binary = np.asarray(binary)
+    labeler = StreamingLabeler(binary.shape[1], connectivity)
+    rows, starts, ends, run_labels = labeler.add_strip(binary)
+    amount_labels, stats, final_labels = labeler.finish()
+
+    # We paint the labeled image: the pixels equal to 1, read row by row, are
+    # exactly the pixels of the runs, one run after the other.
+    labeled = np.zeros(binary.shape, dtype=np.int32)
+    lengths = ends - starts
+    labeled.reshape(-1)[np.flatnonzero(binary)] = np.repeat(final_labels[run_labels], lengths)
+    return amount_labels, labeled, stats
+
+def label_stats_by_strips(strips, width, connectivity=8):
+    '''
+    Compute the statistics of the components of an image given strip by strip,
+    without keeping the image in memory (for example, strips read one by one
+    from a file). The labeled image is not created.
+
+    Args:
+        strips: Iterable of binary images, with the rows of the image from top to bottom.
+        width: Amount of columns of the image.
+        connectivity (optional): 4 or 8.
+
+    Returns:
+        Tuple with the amount of labels (background included) and the dictionary
+        with the statistics (see get_stats_from_sums).
+    '''
+    labeler = StreamingLabeler(width, connectivity)
+    for strip in strips:
+        labeler.add_strip(strip)
+    amount_labels, stats, _ = labeler.finish()
+    return amount_labels, stats
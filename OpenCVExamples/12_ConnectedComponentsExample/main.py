@@ -2,8 +2,10 @@ import cv2
 import os
 
 import numpy as np
-# This module only contains one variable with a bunch of colors in the HSV space
-from colors import hsv_label_colors
+# This module creates the colors used to paint the labels, already in BGR
+from palette import get_label_palette
+# This module labels the image and computes the statistics of each component at the same time
+from labeling import connected_components_with_moments
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 
@@ -19,46 +21,23 @@ def threshold_image(img, threshold):
     Returns:
         Binary image, result of thresholding the input with the given threshold.
     '''
-    # We create an empty binary image with zeros only
-    binary = np.zeros(img.shape)
-    # We place ones only in the pixels where the original image values are
-    # higher than the threshold
-    binary[img > threshold] = 1
-    return np.array(binary, dtype=np.uint8)
-
-def get_connected_labeled_image(img, conn):
-    '''
-    We label an image in different elements, using the connected-components
-    algorithm from OpenCV.
-
-    This function allows to choose the 4- or 8-connected components patternt.
-
-    Args:
-        img: Binary image to be labeled (only zeros and 1s are allowed)
-        conn: Connected components pattern (integer value, only 4 or 8 are valid options)
-
-    Returns:
-        Image where each pixel is labeled with an integer value (0 for the background,
-        1,2,3,4,etc for the different objects).
-    '''
-    # We check if the image is binary filled only with 0s and 1s
-    assert(np.max(img) == 1 and np.min(img) == 0)
-    # We check that the input connected pattern is 4 or 8
-    assert(conn == 4 or conn == 8)
-    # We apply the OpenCV connected components algorithm. The output of this algorithm
-    # is a tuple: The first element is the amount of labels found, and the second
-    # element is the labeled image.
-    labeled = cv2.connectedComponents(img, connectivity=conn)
-
-    print("The image has been labeled with {p}-connected pattern. {l} labels has been found".format(p=conn, l=labeled[0]))
-    # We return all the labeled image only
-    return labeled[1]
+    # We compare all the pixels with the threshold, and we write the result
+    # (1 for True, 0 for False) directly in an image coded in 8-bits. This way
+    # we go over the image only once, and no intermediate image is created.
+    binary = np.empty(img.shape, dtype=np.uint8)
+    np.greater(img, threshold, out=binary)
+    return binary
 
 def create_color_image_from_labeled(labeled_img):
     '''
     We convert a labeled image (image obtained after applying the ConnectedComponents
     algorithm) into a colored image.
 
+    Instead of painting the pixels of each label one after the other, we create
+    a palette: a table with one color per label (a LUT with 3 values per entry).
+    Then, the color image is obtained by indexing the palette with the labeled
+    image, so we go over the image only once, whatever the amount of labels is.
+
     Args:
         labeled_img: Image where each pixel contains a number that identifies certain
         class. All the pixels that belongs to the same class (i.e., have the same
@@ -68,30 +47,22 @@ def create_color_image_from_labeled(labeled_img):
         RGB image where all the pixels that belong to the same class are painted
         with the same color.
     '''
-    # We create a color image: It will have the same size as the input image, but
-    # it will contain 3 channels
-    output = np.zeros(labeled_img.shape + (3,), dtype=np.uint8)
-    # We determine the amount of labels in the image. We add one since the for loop
-    # does not consider the last element
+    # We determine the amount of labels in the image. We add one since the
+    # background (label 0) is also in the palette
     amount_labels = np.max(labeled_img) + 1
-
-    # We determine how many colors we imported from the module colors.py
-    amount_colors = len(hsv_label_colors)
     print("There are {} labels".format(amount_labels))
 
-    # We label all the pixels. For all the labels, we assign the same colors to
-    # the pixels that have the same label.
-    for i in range(1, amount_labels):
-        # We determine the color to use. If we have more labels than colors,
-        # we restart the counter, i.e., different classes will have the same
-        # color, but since they will be far away one each other, it will be
-        # easy to identify them
-        idx = i % amount_colors
-        output[labeled_img == i] = hsv_label_colors[idx]
+    # We determine the color of each label. If we have more labels than colors,
+    # we restart the counter, i.e., different classes will have the same
+    # color, but since they will be far away one each other, it will be
+    # easy to identify them
+    bgr_colors = get_label_palette()
+    palette = bgr_colors[np.arange(amount_labels) % len(bgr_colors)]
+    # The background is always black
+    palette[0] = 0
 
-    # Since the assigned colors are in HSV space, we convert them into BGR
-    # system to show the image in OpenCV
-    return cv2.cvtColor(output, cv2.COLOR_HSV2BGR)
+    # We paint all the pixels at once: each pixel takes the color of its label.
+    return palette[labeled_img]
 
 def get_image_example():
     '''
@@ -127,7 +98,14 @@ def main():
     # NOTE: If you want to run the example of the theory, uncomment the line below.
     # binary = get_image_example()
 
-    labeled_image = get_connected_labeled_image(binary, 4)
+    # We label the image, computing at the same time the area, the bounding box,
+    # the mass center and the central moments of each component. The labels are
+    # the same as the ones of cv2.connectedComponents.
+    amount_labels, labeled_image, stats = connected_components_with_moments(binary, 4)
+    print("The image has been labeled with {p}-connected pattern. {l} labels has been found".format(p=4, l=amount_labels))
+    biggest = np.argmax(stats['area'])
+    print("The biggest of the {} components has {} pixels, and its mass center is ({:.1f}, {:.1f})".format(
+        amount_labels - 1, int(stats['area'][biggest]), stats['mass_center_row'][biggest], stats['mass_center_col'][biggest]))
     colored_image = create_color_image_from_labeled(labeled_image)
 
     gl_window_name = 'Binary images'
@@ -0,0 +1,52 @@
+import functools
+
+import cv2
+import numpy as np
+
+'''
+This module creates the colors used to paint the labels of an image.
+
+The colors are created in the HSV space, and converted once to BGR. In OpenCV,
+the hue has 180 possible values. To have consecutive labels painted with very
+different colors, the hue of the color i is i * HUE_STEP, modulo 180. HUE_STEP is
+the integer closest to the golden angle (137.5 degrees, i.e., 68.75 in the OpenCV
+scale) that has no common divisor with 180: this way each new hue falls far
+from the previous ones, and the 180 hues appear before any of them repeats.
+The saturation and value change cyclically between four combinations, so the
+palette contains 4 * 180 = 720 different colors.
+'''
+
+# Step between consecutive hues, in the OpenCV scale [0, 180)
+HUE_STEP = 67
+AMOUNT_HUES = 180
+
+# Combinations (saturation, value) used cyclically for the colors
+SATURATION_VALUES = [(100, 255), (150, 200), (200, 180), (255, 100)]
+
+@functools.lru_cache(maxsize=None)
+def get_label_palette(amount_colors=720):
+    '''
+    Create the list of colors used to paint the labels. The palette is created
+    only once for each amount of colors: the result is kept in a cache for the
+    next calls.
+
+    Args:
+        amount_colors (optional): Amount of different colors in the palette.
+
+    Returns:
+        Read-only matrix of shape (amount_colors, 3), coded in 8-bits, with one
+        BGR color per row.
+    '''
+    indexes = np.arange(amount_colors)
+    hsv_colors = np.zeros((amount_colors, 3), dtype=np.uint8)
+    hsv_colors[:, 0] = (indexes * HUE_STEP) % AMOUNT_HUES
+    # We add indexes // AMOUNT_HUES, so the colors with the same hue get a
+    # different combination of saturation and value
+    sat_val = np.array(SATURATION_VALUES, dtype=np.uint8)
+    hsv_colors[:, 1:] = sat_val[(indexes + indexes // AMOUNT_HUES) % len(sat_val)]
+
+    # cv2.cvtColor works with images, so we see the list of colors as an image
+    # of a single row.
+    bgr_colors = cv2.cvtColor(hsv_colors.reshape(1, -1, 3), cv2.COLOR_HSV2BGR).reshape(-1, 3)
+    bgr_colors.setflags(write=False)
+    return bgr_colors
@@ -0,0 +1,215 @@
+import cv2
+import os
+import time
+import concurrent.futures
+
+import numpy as np
+# We use the union-find of the run-based labeling to join the labels across tiles
+from labeling import join_pairs
+
+root_dir = os.path.dirname(os.path.realpath(__file__))
+
+'''
+Connected-components labeling of very big images, using several processes.
+
+    1) The image is split into tiles, and each tile is labeled independently
+        with cv2.connectedComponents, in a pool of processes.
+    2) The labels of each tile are moved, so the labels of different tiles
+        never overlap (the tile k starts after the last label of the tile k - 1).
+    3) A component cut by the border between two tiles has a label in each tile.
+        We look at the pixels at both sides of each border: if both are objects
+        (and touch each other, for the given connectivity), their labels belong to
+        the same component. We join them with a union-find.
+    4) We create a LUT that converts each tile label into its final label, and we
+        apply it to each tile when we copy it into the output image.
+
+The result is the same as cv2.connectedComponents on the whole image, except
+for the numbers given to each component (see compare_with_opencv).
+'''
+
+def label_tile(tile, connectivity):
+    '''
+    Label a single tile. This function is executed by the processes of the pool.
+
+    Args:
+        tile: Binary image of the tile.
+        connectivity: 4 or 8.
+
+    Returns:
+        Tuple with the amount of labels (background included) and the labeled tile.
+    '''
+    return cv2.connectedComponents(tile, connectivity=connectivity)
+
+def initialize_worker():
+    '''
+    Each process labels a tile with a single thread, so the processes do not
+    compete for the processor with the threads of OpenCV.
+    '''
+    cv2.setNumThreads(1)
+
+def get_border_pairs(first, second, connectivity):
+    '''
+    Find the pairs of labels that touch across a border between two tiles.
+
+    Args:
+        first: Labels of the pixels at one side of the border (1D array).
+        second: Labels of the pixels at the other side, in the same order.
+        connectivity: 4 or 8. With 8, the diagonal neighbours also touch.
+
+    Returns:
+        Tuple with two arrays, with the labels of each pair.
+    '''
+    pairs_first = [first]
+    pairs_second = [second]
+    if connectivity == 8:
+        # Diagonal neighbours: the pixel k touches the pixels k - 1 and k + 1
+        pairs_first += [first[1:], first[:-1]]
+        pairs_second += [second[:-1], second[1:]]
+    first = np.concatenate(pairs_first)
+    second = np.concatenate(pairs_second)
+    both_objects = (first != 0) & (second != 0)
+    return first[both_objects], second[both_objects]
+
+def tiled_connected_components(binary, connectivity=8, tile_size=1024, workers=None):
+    '''
+    Label a binary image by tiles, with several processes.
+
+    Args:
+        binary: Binary image (only zeros and 1s), coded in 8-bits.
+        connectivity (optional): 4 or 8.
+        tile_size (optional): Amount of rows and columns of each tile.
+        workers (optional): Amount of processes. With 1, everything is done in
+            this process. By default, one process per processor.
+
+    Returns:
+        Tuple with the amount of labels (background included) and the labeled image (int32).
+    '''
+    assert(connectivity == 4 or connectivity == 8)
+    binary = np.asarray(binary, dtype=np.uint8)
+    rows, cols = binary.shape
+    row_starts = list(range(0, rows, tile_size))
+    col_starts = list(range(0, cols, tile_size))
+    tiles = [(r, c) for r in row_starts for c in col_starts]
+    tile_images = [np.ascontiguousarray(binary[r:r + tile_size, c:c + tile_size]) for r, c in tiles]
+
+    # 1) We label all the tiles
+    if workers == 1:
+        results = [label_tile(tile, connectivity) for tile in tile_images]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker) as pool:
+            results = list(pool.map(label_tile, tile_images, [connectivity] * len(tile_images)))
+
+    # 2) Each tile starts after the last label of the previous tiles. The global
+    # label 0 is the background.
+    amounts = np.array([amount - 1 for amount, _ in results], dtype=np.int64)
+    offsets = dict(zip(tiles, np.cumsum(amounts) - amounts))
+    labeled_tiles = dict(zip(tiles, [labels for _, labels in results]))
+    total = int(np.sum(amounts))
+
+    def to_global(tile, labels):
+        # We move the labels of the tile, keeping the background at 0
+        return np.where(labels != 0, labels + offsets[tile], 0)
+
+    # 3) We join the labels that touch across the borders between tiles
+    pairs_first = []
+    pairs_second = []
+    for r, c in tiles:
+        labels = labeled_tiles[(r, c)]
+        if (r, c + tile_size) in labeled_tiles:
+            # Vertical border: last column of this tile, first column of the right tile
+            right = labeled_tiles[(r, c + tile_size)]
+            first, second = get_border_pairs(to_global((r, c), labels[:, -1]),
+                to_global((r, c + tile_size), right[:, 0]), connectivity)
+            pairs_first.append(first)
+            pairs_second.append(second)
+        if (r + tile_size, c) in labeled_tiles:
+            # Horizontal border: last row of this tile, first row of the tile below
+            below = labeled_tiles[(r + tile_size, c)]
+            first, second = get_border_pairs(to_global((r, c), labels[-1, :]),
+                to_global((r + tile_size, c), below[0, :]), connectivity)
+            pairs_first.append(first)
+            pairs_second.append(second)
+        if connectivity == 8 and (r + tile_size, c + tile_size) in labeled_tiles:
+            # The corners of the diagonal tiles also touch each other
+            corner = labeled_tiles[(r + tile_size, c + tile_size)]
+            first, second = get_border_pairs(to_global((r, c), labels[-1:, -1]),
+                to_global((r + tile_size, c + tile_size), corner[0:1, 0]), 4)
+            pairs_first.append(first)
+            pairs_second.append(second)
+        if connectivity == 8 and (r + tile_size, c - tile_size) in labeled_tiles:
+            corner = labeled_tiles[(r + tile_size, c - tile_size)]
+            first, second = get_border_pairs(to_global((r, c), labels[-1:, 0]),
+                to_global((r + tile_size, c - tile_size), corner[0:1, -1]), 4)
+            pairs_first.append(first)
+            pairs_second.append(second)
+
+    first = np.concatenate(pairs_first) if pairs_first else np.zeros(0, dtype=np.int64)
+    second = np.concatenate(pairs_second) if pairs_second else np.zeros(0, dtype=np.int64)
+    roots = join_pairs(total + 1, first, second)
+
+    # 4) We create the LUT from the global labels to the final labels: 1, 2, 3...
+    # in the order of the roots. The background (root 0) stays at 0.
+    _, lut = np.unique(roots, return_inverse=True)
+    lut = np.array(lut.reshape(-1), dtype=np.int32)
+    amount_labels = int(lut.max()) + 1 if total else 1
+
+    output = np.empty((rows, cols), dtype=np.int32)
+    for tile, amount in zip(tiles, amounts):
+        r, c = tile
+        # LUT of this tile: the local label k becomes lut[k + offset], and 0 stays 0
+        tile_lut = np.concatenate(([0], lut[offsets[tile] + 1:offsets[tile] + amount + 1]))
+        output[r:r + tile_size, c:c + tile_size] = tile_lut[labeled_tiles[tile]]
+    return amount_labels, output
+
+def compare_with_opencv(binary, connectivity, labeled):
+    '''
+    Check that a labeled image is the same as the result of cv2.connectedComponents,
+    except for the numbers given to each component: there has to be a one-to-one
+    relation between our labels and the labels of OpenCV.
+
+    Args:
+        binary: Binary image that was labeled.
+        connectivity: 4 or 8.
+        labeled: Labeled image to check.
+
+    Returns:
+        True if both labelings are the same.
+    '''
+    amount, reference = cv2.connectedComponents(np.asarray(binary, dtype=np.uint8), connectivity=connectivity)
+    if labeled.max() + 1 != amount:
+        return False
+    # Each of our labels must correspond to a single label of OpenCV, and the other way round
+    pairs = np.unique(np.stack((labeled.reshape(-1), reference.reshape(-1))), axis=1)
+    return pairs.shape[1] == len(np.unique(labeled)) and pairs.shape[1] == len(np.unique(reference))
+
+def main():
+    '''
+    We build a big mosaic by repeating the binarized metal image, we check that
+    the tiled labeling gives the same components as OpenCV, and we measure the
+    time with 1 until N processes.
+    '''
+    img_filepath = os.path.join(root_dir, 'images', 'metal.png')
+    gray_img = cv2.imread(img_filepath, cv2.IMREAD_GRAYSCALE | cv2.IMREAD_ANYDEPTH)
+    if gray_img is None:
+        print("We couldn't load the image located at {}".format(img_filepath))
+        return
+    binary = np.array(gray_img > 120, dtype=np.uint8)
+    mosaic = np.tile(binary, (8000 // binary.shape[0] + 1, 8000 // binary.shape[1] + 1))
+
+    # We check the result on a smaller image, with tiles that cut many components
+    for connectivity in [4, 8]:
+        amount, labeled = tiled_connected_components(mosaic[:1500, :1500], connectivity, tile_size=100, workers=2)
+        print("{}-connected: {} labels, same as OpenCV: {}".format(connectivity, amount,
+            compare_with_opencv(mosaic[:1500, :1500], connectivity, labeled)))
+
+    print("Mosaic of {} x {} pixels".format(mosaic.shape[0], mosaic.shape[1]))
+    begin = time.time()
+    cv2.connectedComponents(mosaic, connectivity=8)
+    print("OpenCV: {:.3f} sec".format(time.time() - begin))
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        begin = time.time()
+        tiled_connected_components(mosaic, 8, tile_size=2048, workers=workers)
+        print("Tiled labeling with {} processes: {:.3f} sec".format(workers, time.time() - begin))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import cv2
+import os
+import sys
+import glob
+import time
+import hashlib
+import tempfile
+import concurrent.futures
+
+import numpy as np
+from particle_table import ParticleTable, compute_particle_table
+
+root_dir = os.path.dirname(os.path.realpath(__file__))
+
+# Version of the columns saved in the shards. It must be increased each time the
+# columns of compute_particle_table change, so the old shards are computed again.
+#   1: Moments, enclosing box and ellipse (shards without version).
+#   2: Contour parameters (perimeter, solidity, Feret diameters...).
+SHARD_VERSION = 2
+
+'''
+Extraction of the parameters of the particles of many labeled images.
+
+    1) The images are processed in a pool of processes. Each process reads a
+        labeled image, and computes the table of its particles (see
+        compute_particle_table).
+    2) The table of each image is saved in its own file (a shard), in the numpy
+        format .npz, with one array per column. The name of the shard depends on
+        the path of the image, so if the extraction is stopped, running it again
+        only processes the images that do not have a shard yet. Each shard
+        keeps the version of its columns (SHARD_VERSION), and the shards of an
+        older version are computed again.
+    3) To analyze all the particles together, we load the columns of all the
+        shards (load_feature_store), without reading the images again.
+'''
+
+def get_shard_filepath(output_dir, img_filepath):
+    '''
+    Get the path of the shard where the particles of an image are saved.
+
+    Args:
+        output_dir: Folder with all the shards.
+        img_filepath: Path of the labeled image.
+
+    Returns:
+        Path of the shard: the name of the image, and a hash of its full path, so
+        two images with the same name in different folders get different shards.
+    '''
+    full_path = os.path.abspath(img_filepath)
+    path_hash = hashlib.sha1(full_path.encode('utf-8')).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(full_path))[0]
+    return os.path.join(output_dir, '{}_{}.npz'.format(name, path_hash))
+
+def get_shard_version(shard_filepath):
+    '''
+    Get the version of the columns of a shard (see SHARD_VERSION).
+
+    Args:
+        shard_filepath: Path of the shard.
+
+    Returns:
+        Version of the shard, 1 for the shards saved without version, or 0 if
+        the shard does not exist.
+    '''
+    if not os.path.exists(shard_filepath):
+        return 0
+    with np.load(shard_filepath) as shard:
+        return int(shard['version']) if 'version' in shard.files else 1
+
+def extract_image_features(img_filepath, shard_filepath):
+    '''
+    Compute the particles of a labeled image (with the parameters of their
+    contours), and save them in a shard. This function is executed by the
+    processes of the pool.
+
+    Args:
+        img_filepath: Path of the labeled image.
+        shard_filepath: Path of the shard to create.
+
+    Returns:
+        Amount of particles of the image, or -1 if the image could not be read.
+    '''
+    labeled_img = cv2.imread(img_filepath, cv2.IMREAD_GRAYSCALE | cv2.IMREAD_ANYDEPTH)
+    if labeled_img is None:
+        return -1
+    table = compute_particle_table(labeled_img, contour_features=True)
+    # We write a temporary file, and we rename it at the end: if the process is
+    # stopped while writing, there is no incomplete shard, and the image will be
+    # processed again.
+    temporary_filepath = shard_filepath + '.tmp.npz'
+    np.savez(temporary_filepath, source=np.array(os.path.abspath(img_filepath)),
+        image_size=np.array(table.image_size), version=np.array(SHARD_VERSION), **table.columns)
+    os.replace(temporary_filepath, shard_filepath)
+    return len(table)
+
+def initialize_worker():
+    '''
+    Each process works with a single thread, so the processes do not compete
+    for the processor with the threads of OpenCV.
+    '''
+    cv2.setNumThreads(1)
+
+def extract_features(img_filepaths, output_dir, workers=None):
+    '''
+    Compute the particles of many labeled images, with several processes, and
+    save them in output_dir. The images that already have a shard of the current
+    version are skipped. If an image cannot be processed, we show the error and
+    we continue with the rest.
+
+    Args:
+        img_filepaths: List with the paths of the labeled images.
+        output_dir: Folder where the shards are saved.
+        workers (optional): Amount of processes. With 1, everything is done in
+            this process. By default, one process per processor.
+
+    Returns:
+        Tuple with the amount of images processed, and the amount of particles found
+        in them.
+    '''
+    os.makedirs(output_dir, exist_ok=True)
+    pending = []
+    for img_filepath in img_filepaths:
+        shard_filepath = get_shard_filepath(output_dir, img_filepath)
+        if get_shard_version(shard_filepath) != SHARD_VERSION:
+            pending.append((img_filepath, shard_filepath))
+    print("{} images, {} already processed".format(len(img_filepaths), len(img_filepaths) - len(pending)))
+    if not pending:
+        return 0, 0
+
+    begin = time.time()
+    amount_particles = 0
+
+    def show_progress(done, img_filepath, particles, error=None):
+        elapsed = time.time() - begin
+        remaining = elapsed / done * (len(pending) - done)
+        if error is not None:
+            print("We couldn't process the image located at {}: {}".format(img_filepath, error))
+        elif particles < 0:
+            print("We couldn't load the image located at {}".format(img_filepath))
+        print("{}/{} images, {} particles, {:.1f} sec, {:.1f} sec remaining".format(
+            done, len(pending), amount_particles, elapsed, remaining))
+
+    if workers == 1:
+        for done, (img_filepath, shard_filepath) in enumerate(pending, 1):
+            error = None
+            try:
+                particles = extract_image_features(img_filepath, shard_filepath)
+            except Exception as exception:
+                particles, error = -1, exception
+            amount_particles += max(particles, 0)
+            show_progress(done, img_filepath, particles, error)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker) as pool:
+            futures = dict((pool.submit(extract_image_features, img_filepath, shard_filepath), img_filepath)
+                for img_filepath, shard_filepath in pending)
+            # We show the progress as the images are finished, in any order
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                # An error in one image does not stop the rest of the images
+                error = future.exception()
+                particles = -1 if error is not None else future.result()
+                amount_particles += max(particles, 0)
+                show_progress(done, futures[future], particles, error)
+    return len(pending), amount_particles
+
+def load_feature_store(output_dir, column_names=None):
+    '''
+    Load the particles of all the shards of a folder in a single table. The
+    shards of an older version (see SHARD_VERSION) are skipped: run
+    extract_features again to compute them.
+
+    Args:
+        output_dir: Folder with the shards.
+        column_names (optional): Names of the columns to load. By default, all
+            of them.
+
+    Returns:
+        Tuple with the ParticleTable of all the particles, and the list of the
+        paths of the images. The table has an extra column 'image' with the
+        position of the image of each particle in this list.
+    '''
+    shard_filepaths = sorted(glob.glob(os.path.join(output_dir, '*.npz')))
+    shard_filepaths = [filepath for filepath in shard_filepaths if not filepath.endswith('.tmp.npz')]
+    sources = []
+    columns = {}
+    images = []
+    for shard_filepath in shard_filepaths:
+        with np.load(shard_filepath) as shard:
+            version = int(shard['version']) if 'version' in shard.files else 1
+            if version != SHARD_VERSION:
+                print("The shard {} has the version {}, instead of {}: we skip it".format(
+                    shard_filepath, version, SHARD_VERSION))
+                continue
+            image = len(sources)
+            sources.append(str(shard['source']))
+            names = column_names if column_names is not None else \
+                [name for name in shard.files if name not in ('source', 'image_size', 'version')]
+            for name in names:
+                columns.setdefault(name, []).append(shard[name])
+            images.append(np.full(len(shard['id']), image, dtype=np.int32))
+    columns = dict((name, np.concatenate(values)) for name, values in columns.items())
+    columns['image'] = np.concatenate(images) if images else np.zeros(0, dtype=np.int32)
+    # The particles come from several images, so the table has no image size
+    return ParticleTable(columns, None), sources
+
+def main():
+    '''
+    We compute the particles of all the labeled images of a folder (by default,
+    the images of this example), and we show some statistics of all of them.
+    By default, the shards are saved in the temporary folder of the system, so
+    the folder of the example is not modified.
+
+    Usage: python3 ./batch_features.py [images_folder] [output_folder]
+    '''
+    images_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root_dir, 'images')
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), 'particle_features')
+    img_filepaths = sorted(glob.glob(os.path.join(images_dir, 'labeled_*.png')))
+    extract_features(img_filepaths, output_dir)
+
+    table, sources = load_feature_store(output_dir, ['id', 'area', 'elongation', 'solidity'])
+    print("{} particles in {} images".format(len(table), len(sources)))
+    if len(table):
+        print("Mean area: {:.2f}, particles with elongation > 10: {}, particles with solidity < 0.8: {}".format(
+            np.mean(table.area), np.count_nonzero(table.elongation > 10), np.count_nonzero(table.solidity < 0.8)))
+        amount_per_image = np.bincount(table.image, minlength=len(sources))
+        for source, amount in zip(sources, amount_per_image):
+            print("{}: {} particles".format(source, amount))
+
+if __name__ == '__main__':
+    main()
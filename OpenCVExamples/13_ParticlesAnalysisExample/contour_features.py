@@ -0,0 +1,267 @@
+import numpy as np
+
+'''
+Parameters of the particles that depend on their contour: perimeter,
+circularity, convex area, solidity and Feret diameters. They are computed for
+all the particles at once, with a few passes over the labeled image.
+
+    - Perimeter: we count, along the rows, the columns and both diagonals, the
+        pairs of neighbour pixels that belong to different labels (the contour
+        crosses between them). The Crofton formula estimates the length of the
+        contour from these four counts:
+            perimeter = pi / 8 * (n_0 + n_90 + (n_45 + n_135) / sqrt(2))
+        It is exact, on average, for any orientation of the contour, unlike
+        the amount of pixels of the contour, which depends on the orientation.
+    - Circularity: 4 * pi * area / perimeter^2. It is 1 for a circle, and lower
+        for any other shape.
+    - Convex hull: for each angle of a set of angles (64 by default), we find
+        the support point of each particle: its point with the maximum projection
+        in the direction of that angle. Only the pixels of the contour can be the
+        maximum, so we project only them. The support points, sorted by angle,
+        are vertices of the convex hull, and they form a convex polygon. The
+        hull vertices that are missed are very flat ones, so the area of the
+        polygon (the convex area) is lower than the area of the hull by less
+        than 1% in the particles of the example.
+    - Solidity: area / convex area. It is 1 for convex particles, and lower for
+        particles with holes or concavities.
+    - Feret diameters: the width of the particle measured with a caliper, in
+        the direction in which it is maximum and in which it is minimum. They
+        are computed from the polygon of the support points (see
+        get_feret_diameters).
+
+The pixels are squares of side 1, so the support points are the corners of the
+pixels, not their centers.
+'''
+
+# Names of the columns added to the particle tables
+CONTOUR_COLUMN_NAMES = ['perimeter', 'circularity', 'convex_area', 'solidity', 'max_feret', 'min_feret']
+
+def count_label_pairs(first, second, amount_labels):
+    '''
+    Count, for each label, the pairs of neighbour pixels in which one pixel has
+    that label, and the other pixel has a different one.
+
+    Args:
+        first: Labels of the first pixel of each pair.
+        second: Labels of the second pixel, in the same order.
+        amount_labels: Amount of labels, background included.
+
+    Returns:
+        Array with the amount of pairs of each label.
+    '''
+    different = first != second
+    return np.bincount(first[different], minlength=amount_labels) + \
+        np.bincount(second[different], minlength=amount_labels)
+
+def get_perimeters(labeled_img, amount_labels):
+    '''
+    Estimate the perimeter of all the labels with the Crofton formula.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+        amount_labels: Amount of labels, background included.
+
+    Returns:
+        Array with the perimeter of each label.
+    '''
+    # The pixels outside the image are background, so the contour at the
+    # borders of the image is counted too.
+    padded = np.pad(np.asarray(labeled_img), 1, 'constant')
+    n_0 = count_label_pairs(padded[:, :-1].reshape(-1), padded[:, 1:].reshape(-1), amount_labels)
+    n_90 = count_label_pairs(padded[:-1, :].reshape(-1), padded[1:, :].reshape(-1), amount_labels)
+    n_45 = count_label_pairs(padded[1:, :-1].reshape(-1), padded[:-1, 1:].reshape(-1), amount_labels)
+    n_135 = count_label_pairs(padded[:-1, :-1].reshape(-1), padded[1:, 1:].reshape(-1), amount_labels)
+    return np.pi / 8.0 * (n_0 + n_90 + (n_45 + n_135) / np.sqrt(2.0))
+
+def get_contour_pixels(labeled_img):
+    '''
+    Find the pixels of the contour of all the particles: the pixels that have,
+    at least, one of their 4 neighbours with a different label.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+
+    Returns:
+        Tuple with three arrays: the label, the row and the column of each pixel
+        of the contour, sorted by label.
+    '''
+    padded = np.pad(np.asarray(labeled_img), 1, 'constant')
+    center = padded[1:-1, 1:-1]
+    contour = (center != 0) & ((center != padded[:-2, 1:-1]) | (center != padded[2:, 1:-1]) |
+        (center != padded[1:-1, :-2]) | (center != padded[1:-1, 2:]))
+    rows, cols = np.nonzero(contour)
+    labels = center[rows, cols]
+    order = np.argsort(labels, kind='stable')
+    return labels[order], rows[order], cols[order]
+
+def get_segment_argmax(values, starts, segments):
+    '''
+    Find the position of the maximum of each segment of an array.
+
+    Args:
+        values: Array with all the segments, one after the other.
+        starts: Position where each segment starts (segments of at least 1 element).
+        segments: Segment of each element of values.
+
+    Returns:
+        Array with the position (in values) of the first maximum of each segment.
+    '''
+    maximums = np.maximum.reduceat(values, starts)
+    positions = np.arange(len(values))
+    # The positions that are not a maximum get a position after the end
+    positions = np.where(values == maximums[segments], positions, len(values))
+    return np.minimum.reduceat(positions, starts)
+
+def get_support_points(labeled_img, amount_labels, amount_angles=64):
+    '''
+    Compute the support points of all the labels: for each angle, the point of
+    the particle with the maximum projection in the direction of that angle.
+    Since the pixels are squares, the point is the corner of the pixel that
+    points in that direction.
+
+    The support points are vertices of the convex hull of the particle, and
+    they are sorted by angle, so they are the vertices of a convex polygon
+    inside the convex hull. The vertices of the hull that are not found are
+    the ones with a very flat angle, so the area of the polygon is almost the
+    area of the hull.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+        amount_labels: Amount of labels, background included.
+        amount_angles (optional): Amount of angles, from 0 until 2 pi. It must be
+            an even number, so the opposite of each angle is also computed.
+
+    Returns:
+        Tuple with three elements: the labels with pixels, and two matrices with
+        the x and the y coordinates of their support points, with one row per
+        angle and one column per label. We use the XY system: x is the column,
+        and y goes up (it is -row).
+    '''
+    assert(amount_angles % 2 == 0 and amount_angles >= 4)
+    angles = np.arange(amount_angles) * (2.0 * np.pi / amount_angles)
+    labels, rows, cols = get_contour_pixels(labeled_img)
+    label_ids, starts, counts = np.unique(labels, return_index=True, return_counts=True)
+    x = cols.astype(np.float64)
+    y = -rows.astype(np.float64)
+    points_x = np.zeros((amount_angles, len(label_ids)))
+    points_y = np.zeros((amount_angles, len(label_ids)))
+    if not len(label_ids):
+        return label_ids, points_x, points_y
+    segments = np.repeat(np.arange(len(label_ids)), counts)
+
+    for k, angle in enumerate(angles):
+        cos_angle = np.cos(angle)
+        sin_angle = np.sin(angle)
+        # We round to remove the tiny values of the cosine of 90 degrees, etc.
+        corner_x = 0.5 * np.sign(np.round(cos_angle, 12))
+        corner_y = 0.5 * np.sign(np.round(sin_angle, 12))
+        support = get_segment_argmax(x * cos_angle + y * sin_angle, starts, segments)
+        points_x[k] = x[support] + corner_x
+        points_y[k] = y[support] + corner_y
+    return label_ids, points_x, points_y
+
+def get_polygon_areas(points_x, points_y):
+    '''
+    Compute the area of many polygons at once, with the shoelace formula.
+
+    Args:
+        points_x: Matrix with the x coordinates of the vertices of each polygon
+            (one polygon per column), in order.
+        points_y: Matrix with the y coordinates, in the same order.
+
+    Returns:
+        Array with the area of each polygon.
+    '''
+    next_x = np.roll(points_x, -1, axis=0)
+    next_y = np.roll(points_y, -1, axis=0)
+    return 0.5 * np.abs(np.sum(points_x * next_y - next_x * points_y, axis=0))
+
+def get_feret_diameters(points_x, points_y):
+    '''
+    Compute the maximum and the minimum Feret diameters of many convex polygons
+    given by their support points (see get_support_points).
+
+    The side between the support points k and k + 1 faces a direction between
+    the angles k and k + 1, so its opposite vertex (the farthest one from it) is
+    the support point k + half or k + half + 1 (half is the half of the amount of
+    angles). We only compare each vertex with the vertices around its opposite:
+        - Maximum: the longest distance between the vertex k and the vertices
+            k + half - 1, k + half and k + half + 1.
+        - Minimum: the minimum width is found with one side of the polygon on one
+            of the lines of the caliper. For each side, the width is the distance
+            from its line to its opposite vertex.
+
+    Args:
+        points_x: Matrix with the x coordinates of the support points, with one
+            row per angle and one column per polygon.
+        points_y: Matrix with the y coordinates, in the same order.
+
+    Returns:
+        Tuple with two arrays: the maximum and the minimum Feret diameter of each
+        polygon.
+    '''
+    amount_angles = points_x.shape[0]
+    half = amount_angles // 2
+    # We repeat the points twice, so the points shifted by any amount are a
+    # slice of these matrices (without copying them).
+    twice_x = np.concatenate((points_x, points_x))
+    twice_y = np.concatenate((points_y, points_y))
+    side_x = twice_x[1:amount_angles + 1] - points_x
+    side_y = twice_y[1:amount_angles + 1] - points_y
+    side_length = np.sqrt(side_x**2 + side_y**2)
+    # The repeated points (sides of length 0) do not define a side
+    no_side = side_length < 1e-9
+    side_length[no_side] = 1.0
+
+    max_distances = np.zeros(points_x.shape)
+    widths = np.zeros(points_x.shape)
+    for shift in [half - 1, half, half + 1]:
+        diff_x = twice_x[shift:shift + amount_angles] - points_x
+        diff_y = twice_y[shift:shift + amount_angles] - points_y
+        np.maximum(max_distances, diff_x**2 + diff_y**2, out=max_distances)
+        if shift != half - 1:
+            # Distance from the opposite vertex to the line of the side, multiplied
+            # by the length of the side (the polygon is counterclockwise, so the
+            # cross product is positive inside)
+            np.maximum(widths, side_x * diff_y - side_y * diff_x, out=widths)
+    widths /= side_length
+    widths[no_side] = np.inf
+    return np.sqrt(np.max(max_distances, axis=0)), np.min(widths, axis=0)
+
+def get_contour_features(labeled_img, areas, amount_angles=64):
+    '''
+    Compute the contour parameters of all the labels.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+        areas: Amount of pixels of each label, background included (element 0).
+        amount_angles (optional): Amount of angles of the support points.
+
+    Returns:
+        Dictionary with one array per parameter (see CONTOUR_COLUMN_NAMES), with
+        one element per label, background included. The background and the
+        labels without pixels get zeros.
+    '''
+    areas = np.asarray(areas, dtype=np.float64)
+    amount_labels = len(areas)
+    non_empty = areas > 0
+    non_empty[0] = False
+
+    perimeters = get_perimeters(labeled_img, amount_labels)
+    label_ids, points_x, points_y = get_support_points(labeled_img, amount_labels, amount_angles)
+    features = dict((name, np.zeros(amount_labels)) for name in CONTOUR_COLUMN_NAMES)
+    if not len(label_ids):
+        return features
+
+    convex_areas = get_polygon_areas(points_x, points_y)
+    max_feret, min_feret = get_feret_diameters(points_x, points_y)
+    areas = areas[label_ids]
+    features['perimeter'][label_ids] = perimeters[label_ids]
+    features['circularity'][label_ids] = 4.0 * np.pi * areas / perimeters[label_ids]**2
+    features['convex_area'][label_ids] = convex_areas
+    # The polygon misses some flat vertices of the hull, so the convex area can
+    # be a tiny bit lower than the area
+    features['solidity'][label_ids] = np.minimum(areas / convex_areas, 1.0)
+    features['max_feret'][label_ids] = max_feret
+    features['min_feret'][label_ids] = min_feret
+    return features
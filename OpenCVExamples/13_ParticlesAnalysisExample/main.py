@@ -2,7 +2,10 @@ import cv2
 import os
 
 import numpy as np
-from particle import Particle
+from particle_table import compute_particle_table
+from particle_query import ParticleQuery
+from rendering import render_feature_map
+from spatial_index import ParticleSpatialIndex
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 
@@ -25,95 +28,6 @@ def convert_into_binary(labeled_img):
     output[labeled_img != 0] = 1
     return output
 
-def get_particles_params(labeled_img):
-    '''
-    Create particle objects for each binary object in the image. Each object
-    contains the parameters of the given particle.
-
-    Args:
-        labeled: Image labeled using the connected components algorithm. Each
-            pixel contains an integer number that identifies the class to which
-            it belongs to. 0 is always the background.
-
-    Returns:
-        Array with as many particles as classes in the labeled image. Each
-        element in this array contains all the computed parameters of the particle.
-    '''
-    # We create an empty list where we will store all the parameters.
-    particles = []
-    # We store in the variable the amount of labels present in the image.
-    amount_labels = np.amax(labeled_img) + 1
-    # We convert the image to a numpy array, to be sure that we count with the
-    # indexing property of numpy arrays
-    np_img = np.array(labeled_img)
-
-    # For each class, we extract which pixels belongs to the given class, and
-    # we create a particle object, that we store in our list called "particles"
-    for class_id in range(1, amount_labels):
-        obj = np.array(np.where(np_img == class_id))
-        my_particle = Particle(class_id, obj, np_img.shape)
-        particles.append(my_particle)
-
-    return particles
-
-def show_particles_animation(particles):
-    '''
-    Animation that shows particle by particle, with the equivalent ellipse
-    corresponding to that particle. Pressing any key will make the animation
-    to swtich to the next particle. When all the particles have been shown,
-    it restarts showing the first one. If we press Q or q, the animation exits.
-
-    Args:
-        particles: Array with all the particles computed in the image.
-    '''
-    index = 1
-    key = -1
-    # We create a named window where we will show the animation
-    cv2.namedWindow('Animation', cv2.WINDOW_NORMAL)
-    # These are the angles used to plot the ellipse. Since we want the entire ellipse
-    # to be shown, we go from 0 until 360 degrees.
-    startAngle = 0
-    endAngle = 360
-
-    # We repeat the loop while we do not press any key, or until the entered key is q or Q.
-    while key == -1 or (chr(key) != 'q' and chr(key) != 'Q'):
-        # We get the particle that corresponds to the index i
-        part = particles[index]
-        # WE create an empty image, filled with zeros, and with 3 channels
-        binary = np.zeros(part.image_size + (3,), dtype=np.uint8)
-        # We set a white color to all the points that belong to this particle.
-        binary[part.particle_points[0,:], part.particle_points[1,:]] = (255, 255, 255)
-
-        # We create a tuple with the major and minor axis of the ellipse. Note
-        # that both values have to be integer values. NOTE: the opencv function
-        # expects each axis length to be the half of the size of the ellipse main axes,
-        # that's why we divide them by 2
-        axesLength = (int(part.ellipse[1] / 2.0), int(part.ellipse[2] / 2.0))
-
-        # We create a tuple with the coordinates of the center of the ellipse,
-        # in XY system (not in ij).Note that both values have to be integer values.
-        center = (int(part.mass_center_col), int(part.mass_center_row))
-
-        # We create a variable with the angle of the ellipse, in degrees.
-        angle = part.ellipse[0] * 180.0 / np.pi
-
-        # We plot the ellipse in the binary image, centered in "center", with the
-        # major and minor axis given by "axesLength", rotated "angle" degrees,
-        # from 0 until 360 degrees.
-        binary = cv2.ellipse(binary, center, axesLength,
-               angle, startAngle, endAngle, (255,0,0), thickness=1)
-
-        # We show the image
-        cv2.imshow('Animation', binary)
-        # We see the user response
-        key = cv2.waitKey()
-
-        index += 1
-        if index >= len(particles):
-            index = 1
-
-    cv2.destroyAllWindows()
-
 def main():
     '''
     Main function of this Python script.
@@ -133,15 +47,9 @@ def main():
 
     # We convert our image into binary to show it.
     binary = convert_into_binary(labeled_img)
-    # We split the image into Particles, and we compute the different parameters of them
-    particles = get_particles_params(labeled_img)
-
-    # # We show an animation of the particles
-    show_particles_animation(particles)
 
-    # FILTERING: We create a binary image in which we will add only the particles
-    # that comply with certain criterias
-    filtered_image = np.zeros(binary.shape, dtype=np.uint8)
+    # FILTERING: We create a binary image with only the particles that comply
+    # with certain criterias
 
     # We define some variables for the criterias:
     ## Orientations: min and max
@@ -154,27 +62,51 @@ def main():
     min_elongation = 8
     max_elongation = 50
 
-    # We search in all the particles, and we check if they comply with the different criterias
-    for part in particles:
-        # # Filter 1: Filter by area
-        # if part.area < max_area and part.area > min_area:
-        #     filtered_image[part.particle_points[0,:], part.particle_points[1,:]] = 1
-        #     part.print_particle_params()
-
-        # # Filter 2: Filter by elongation
-        # if part.elongation < max_elongation and part.elongation > min_elongation:
-        #     filtered_image[part.particle_points[0,:], part.particle_points[1,:]] = 1
-        #     part.print_particle_params()
-
-        # # Filter 3: Filter by elongation and area
-        # if part.elongation < max_elongation and part.elongation > min_elongation and part.area < 3000 and part.area > 100:
-        #     filtered_image[part.particle_points[0,:], part.particle_points[1,:]] = 1
-        #     part.print_particle_params()
-
-        # Filter 4: Elongation, orientation and area
-        if part.elongation > 10 and part.ellipse[0] > min_angle and part.ellipse[0] < max_angle and part.area < 1700:
-            filtered_image[part.particle_points[0,:], part.particle_points[1,:]] = 1
-            part.print_particle_params()
+    # We compute the parameters of all the particles at once, in a table with
+    # one column per parameter, and we create a query engine, that sorts each
+    # column once. Each criteria is a range over some columns (None means no limit).
+    # The table also contains the parameters of the contours (perimeter,
+    # circularity, convex area, solidity and Feret diameters).
+    table = compute_particle_table(labeled_img, contour_features=True)
+    engine = ParticleQuery(table)
+    # The particles can be seen one by one, with their ellipses, running the
+    # particle browser: python3 ./particle_browser.py
+    print("{} particles found".format(np.count_nonzero(table.area)))
+
+    # Filter 1: Filter by area
+    positions = engine.query(area=(min_area, max_area))
+    print("Particles with an area between {} and {}: {}".format(min_area, max_area, len(positions)))
+
+    # Filter 2: Filter by elongation
+    positions = engine.query(elongation=(min_elongation, max_elongation))
+    print("Particles with an elongation between {} and {}: {}".format(min_elongation, max_elongation, len(positions)))
+
+    # Filter by solidity: particles with concavities, or particles touching each other
+    positions = engine.query(solidity=(None, 0.8))
+    print("Particles with a solidity lower than 0.8: {}".format(len(positions)))
+
+    # Filter 3: Filter by elongation and area
+    positions = engine.query(elongation=(min_elongation, max_elongation), area=(100, 3000))
+    print("Particles with an elongation between {} and {}, and an area between 100 and 3000: {}".format(
+        min_elongation, max_elongation, len(positions)))
+
+    # Filter 4: Elongation, orientation and area. This is the filter we show.
+    positions = engine.query(elongation=(10, None), theta=(min_angle, max_angle), area=(None, 1700))
+
+    # We create the image with the pixels of the selected particles
+    filtered_image = engine.render_mask(labeled_img, positions)
+    table[positions].print_particle_params()
+
+    # We create a spatial index of the particles, to find the particles near a
+    # point, and we compute the distance from each particle to the closest one.
+    spatial_index = ParticleSpatialIndex(table)
+    distances = spatial_index.nearest_neighbor_distances()
+    distances = distances[np.isfinite(distances)]
+    if len(distances):
+        print("Distance to the closest particle: mean {:.2f}, median {:.2f}, min {:.2f}, max {:.2f}".format(
+            np.mean(distances), np.median(distances), np.min(distances), np.max(distances)))
+    center = (binary.shape[0] // 2, binary.shape[1] // 2)
+    print("Particle below the center of the image (-1 if none): {}".format(spatial_index.pick(center[0], center[1], labeled_img)))
 
     ################### We show the original binary image, and the filtered image ##################
     gl_window_name = 'Binary image'
@@ -185,6 +117,12 @@ def main():
     cv2.namedWindow(gl_window_name, cv2.WINDOW_NORMAL)
     cv2.imshow(gl_window_name, 255 * filtered_image)
 
+    # We paint each particle with the color of its elongation (from blue, not
+    # elongated, to red, elongation of 50 or more)
+    gl_window_name = 'Elongation map'
+    cv2.namedWindow(gl_window_name, cv2.WINDOW_NORMAL)
+    cv2.imshow(gl_window_name, render_feature_map(labeled_img, table.id, table.elongation, value_range=(0, 50)))
+
     # These lines we need them always
     key = cv2.waitKey()
     while chr(key) != 'q' and chr(key) != 'Q':
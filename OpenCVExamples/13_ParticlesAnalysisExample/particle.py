@@ -1,5 +1,6 @@
 import numpy as np
-import cv2
+from particle_table import get_ellipse_params
+from particle_runs import get_runs_from_points, expand_runs, get_runs_sums, paint_runs
 
 '''
 This class holds all the requirements to compute the particles parameters, and
@@ -8,9 +9,13 @@ store them, so they can be requested later on.
 The only parameters that have to be given are the class id, the image size, and the particle
 pixel positions. Automatically, during construction, the program will compute
 the particule parameters
+
+The pixels are stored as runs (see particle_runs.py): groups of consecutive
+pixels of the same row, given by the row, the first column and the last column + 1.
+All the parameters are computed from the runs.
 '''
 class Particle(object):
-    def __init__(self, id, particle, img_size):
+    def __init__(self, id, particle, img_size, runs=None):
         '''
         Constructor.
 
@@ -18,11 +23,17 @@ class Particle(object):
             id: Integer that represents the class identifier.
             particle: Array of the shape (2,N). Each element is a pixel that belongs
                 to the binary region. N is the amount of pixels in the particle.
-                (0,:) are the rows of all the pixels and (1,:) are the columns
+                (0,:) are the rows of all the pixels and (1,:) are the columns.
+                It is ignored if the runs are given.
+            img_size: Tuple with the amount of rows and columns of the image.
+            runs (optional): Matrix of shape (3, R) with the runs of the particle
+                (rows, first columns and last columns + 1), instead of the pixels.
         '''
         # We initialize all the variables
         self.particle_id = id
-        self.particle_points = np.array(particle)
+        if runs is None:
+            runs = get_runs_from_points(particle)
+        self.runs = np.asarray(runs)
         self.image_size = img_size
         self.area = 0
         self.ratio = 0
@@ -48,8 +59,8 @@ class Particle(object):
         Compute all the particle parameters, and it stores them in this class
         '''
         # The parameters will be computed only if the particle have at least one pixel
-        if self.particle_points.size:
-            self.area = self.particle_points.shape[1]
+        if self.runs.size:
+            self.area = int(np.sum(self.runs[2] - self.runs[1]))
             self.ratio = self.area / (self.image_size[0] * self.image_size[1])
 
             mass_center = self.get_particle_mass_center()
@@ -75,6 +86,29 @@ class Particle(object):
                 short_axis = 0.01
             self.elongation = np.divide(self.ellipse[1], short_axis)**2
 
+    @property
+    def particle_points(self):
+        '''
+        Pixels of the particle, as an array of the shape (2,N): (0,:) are the
+        rows of all the pixels and (1,:) are the columns. They are created from
+        the runs each time they are requested.
+        '''
+        return expand_runs(self.runs)
+
+    def paint(self, img, value=1):
+        '''
+        Paint the pixels of the particle in an image, with one slice assignment
+        per run.
+
+        Args:
+            img: Image to paint (it is modified).
+            value (optional): Value (or color) of the painted pixels.
+
+        Returns:
+            The same image, painted.
+        '''
+        return paint_runs(img, self.runs, value)
+
     def print_particle_params(self):
         '''
         Print all the parmeters of the particle
@@ -112,10 +146,12 @@ class Particle(object):
             Tuple with the mass center given as (row,column). If the particle
             is empty, this tuple is (0,0).
         '''
-        if self.particle_points.size:
-            N = self.particle_points.shape[1]
-            row_avg = np.sum(self.particle_points[0,:]) / float(N)
-            col_avg = np.sum(self.particle_points[1,:]) / float(N)
+        if self.runs.size:
+            # Sums of the rows and of the columns of the pixels of each run
+            row_powers, col_sums = get_runs_sums(self.runs)
+            N = np.sum(col_sums[0])
+            row_avg = np.sum(row_powers[1] * col_sums[0]) / float(N)
+            col_avg = np.sum(col_sums[1]) / float(N)
 
             return (row_avg, col_avg)
         else:
@@ -131,11 +167,12 @@ class Particle(object):
             Array with two tuples. The first tuple contains the minimum
             row and column values, and the second one, the maximums.
         '''
-        max_row = np.amax(self.particle_points[0,:])
-        min_row = np.amin(self.particle_points[0,:])
+        max_row = np.amax(self.runs[0,:])
+        min_row = np.amin(self.runs[0,:])
 
-        max_col = np.amax(self.particle_points[1,:])
-        min_col = np.amin(self.particle_points[1,:])
+        # The last column of each run is the end - 1
+        max_col = np.amax(self.runs[2,:]) - 1
+        min_col = np.amin(self.runs[1,:])
         return [(min_row, min_col), (max_row, max_col)]
 
     def get_moment(self, p, q, center_row, center_col):
@@ -152,11 +189,20 @@ class Particle(object):
             Float value of the computed moment. If the particle size is zero,
             the moment is zero.
         '''
-        if self.particle_points.size:
+        if self.runs.size:
+            if p <= 2 and q <= 2:
+                # The sums of the powers of the distances are computed for each run,
+                # in closed form. The power of the row distance is the same for all
+                # the pixels of a run.
+                row_powers, col_sums = get_runs_sums(self.runs, center_row, center_col)
+                return np.sum(row_powers[p] * col_sums[q])
+
+            # For higher orders, we use the pixels of the particle.
             # We remove the mass center from all the rows and from all the
             # columns
-            rows = self.particle_points[0,:] - center_row
-            cols = self.particle_points[1,:] - center_col
+            points = self.particle_points
+            rows = points[0,:] - center_row
+            cols = points[1,:] - center_col
 
             # We power element-wise the previous variables
             rows_grid_p = np.power(rows, p)
@@ -188,28 +234,7 @@ class Particle(object):
                 2) l: Major axis size
                 3) w: Minor axis size
         '''
-        # We check if the image has pixels
-        if m_0_0:
-            # We convert all the moments to float, to avoid problems of integer
-            # divisions
-            m_0_0 = float(m_0_0)
-            m_2_0 = float(m_2_0)
-            m_0_2 = float(m_0_2)
-            m_1_1 = float(m_1_1)
-
-            # We normalize all the moments, dividing them by the area (or m_0_0)
-            a = m_2_0 / m_0_0
-            # We multiply this factor by two, because in the
-            # formula it always appears multiply by 2
-            b = 2.0 * (m_1_1 / m_0_0)
-            c = m_0_2 / m_0_0
-
-            # We compute the different parameters as it is stated in the paper.
-            # We invert C and A since they are taken in the XY system, and our
-            # moments are computed in the IJ system
-            theta = 0.5 * np.arctan2(b, (c - a))
-            l = np.sqrt(8.0 * (a + c + np.sqrt((b**2) + ((a - c)**2))))
-            w = np.sqrt(8.0 * (a + c - np.sqrt((b**2) + ((a - c)**2))))
-            return [theta, l, w]
-        else:
-            return [0,0,0]
\ No newline at end of file
+        # We use the same computation as for the particle tables, that works
+        # with the moments of many particles at once.
+        theta, l, w = get_ellipse_params(m_0_0, m_2_0, m_0_2, m_1_1)
+        return [float(theta), float(l), float(w)]
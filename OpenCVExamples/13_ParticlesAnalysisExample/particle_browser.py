@@ -0,0 +1,281 @@
+from PyQt5.QtWidgets import \
+    QApplication, \
+    QWidget, \
+    QLabel, \
+    QSlider, \
+    QVBoxLayout
+
+from PyQt5.QtGui import \
+    QPainter, \
+    QPen, \
+    QColor
+
+from PyQt5.QtCore import \
+    Qt, \
+    QPointF, \
+    pyqtSignal
+
+import concurrent.futures
+import sys
+import os
+import cv2
+
+import numpy as np
+from image_widget import ImageWidget
+from particle import Particle
+from particle_table import compute_particle_table
+from particle_runs import get_label_runs
+
+root_dir = os.path.dirname(os.path.realpath(__file__))
+
+'''
+Browser to see the particles of a labeled image one by one, with their
+equivalent ellipse.
+
+Instead of drawing the whole image for each particle, we only draw the piece of
+the image around the particle (its enclosing box, with a margin), scaled to the
+width of the ImageWidget. The ellipse is not drawn on the image: the widget
+draws it over the image, in paintEvent.
+
+The runs of all the particles (see particle_runs.py) are found once, when the
+browser is created. The crop of a particle is drawn from its runs, with one slice
+assignment per run, instead of comparing each pixel of the crop with its label.
+
+While a particle is shown, the particles before and after it are drawn in a
+background thread, so moving to the next particle only needs to show an image
+that is already prepared. The window never waits for a key, as cv2.waitKey does:
+the particle is changed with the slider, or with the arrow keys.
+'''
+
+# Size of the side of the crops shown (the width of the ImageWidget)
+CROP_SIZE = 480
+# Amount of pixels around the enclosing box of the particle
+CROP_MARGIN = 10
+# Amount of particles prepared before and after the shown one
+PREFETCH_RADIUS = 8
+
+def render_crop(labeled_img, table, position, runs):
+    '''
+    Draw the piece of the image around a particle, scaled to CROP_SIZE pixels of
+    width. The pixels of the particle are white, and the pixels of the other
+    particles are dark gray.
+
+    Args:
+        labeled_img: Labeled image.
+        table: ParticleTable of the labeled image.
+        position: Position of the particle in the table.
+        runs: Runs of the particle (see particle_runs.py).
+
+    Returns:
+        Tuple with the scaled crop (gray level image), the row and the column of
+        the image where the crop starts, and the scaling factor.
+    '''
+    # We take a square around the enclosing box, so all the crops have a similar
+    # size once they are scaled
+    center_row = (table.min_row[position] + table.max_row[position]) // 2
+    center_col = (table.min_col[position] + table.max_col[position]) // 2
+    half_side = max(table.height[position], table.width[position]) // 2 + CROP_MARGIN
+    first_row = max(center_row - half_side, 0)
+    first_col = max(center_col - half_side, 0)
+    crop = labeled_img[first_row:center_row + half_side + 1, first_col:center_col + half_side + 1]
+
+    gray = np.zeros(crop.shape, dtype=np.uint8)
+    gray[crop != 0] = 80
+    # We move the runs to the coordinates of the crop, and we paint them. The
+    # enclosing box of the particle is always inside the crop.
+    crop_runs = np.asarray(runs) - np.array([[first_row], [first_col], [first_col]], dtype=np.int32)
+    Particle(table.id[position], None, crop.shape, runs=crop_runs).paint(gray, 255)
+    # We enlarge the crop with the nearest neighbour, so each pixel is a square
+    scaling_factor = CROP_SIZE / float(crop.shape[1])
+    dim = (CROP_SIZE, max(int(round(crop.shape[0] * scaling_factor)), 1))
+    scaled = cv2.resize(gray, dim, interpolation=cv2.INTER_NEAREST)
+    return scaled, first_row, first_col, scaling_factor
+
+class ParticleView(ImageWidget):
+    def __init__(self, parent=None):
+        '''
+        Constructor. The widget shows the crop of a particle, and its ellipse.
+        '''
+        super(ParticleView, self).__init__(parent)
+        # Ellipse in the coordinates of the widget: center (x, y), axes and angle in degrees
+        self.ellipse = None
+        # Row and column of the image where the crop starts, and its scaling factor
+        self.crop_origin = (0, 0)
+        self.crop_scaling = 1.0
+
+    def set_particle(self, crop, first_row, first_col, scaling_factor, ellipse):
+        '''
+        Show the crop of a particle.
+
+        Args:
+            crop, first_row, first_col, scaling_factor: Result of render_crop.
+            ellipse: Tuple with the mass center (row, column) of the particle in
+                the image, and the ellipse (theta, l, w) of the particle.
+        '''
+        (center_row, center_col), (theta, l, w) = ellipse
+        self.crop_origin = (first_row, first_col)
+        self.crop_scaling = scaling_factor
+        self.ellipse = ((center_col - first_col + 0.5) * scaling_factor,
+            (center_row - first_row + 0.5) * scaling_factor,
+            l / 2.0 * scaling_factor, w / 2.0 * scaling_factor, theta * 180.0 / np.pi)
+        # The crop has already the width of the widget, so it is not resized again
+        self.updateImage(crop)
+
+    def mousePressEvent(self, event):
+        '''
+        We print the pixel of the full image, not the one of the crop.
+        '''
+        row = self.crop_origin[0] + int(event.pos().y() / self.crop_scaling)
+        column = self.crop_origin[1] + int(event.pos().x() / self.crop_scaling)
+        print("You have pressed the pixel: (row, column) = ({}, {})".format(row, column))
+
+    def paintEvent(self, event):
+        '''
+        We draw the image, and the ellipse over it. As in cv2.ellipse, the angle
+        is measured from the horizontal axis, clockwise (the rows go down).
+        '''
+        super(ParticleView, self).paintEvent(event)
+        if self.ellipse is not None and not self.showed_image.isNull():
+            x, y, major, minor, angle = self.ellipse
+            painter = QPainter(self)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor(255, 0, 0), 2))
+            painter.translate(x, y)
+            painter.rotate(angle)
+            painter.drawEllipse(QPointF(0, 0), major, minor)
+            painter.end()
+
+class ParticleBrowser(QWidget):
+    # Signal emitted from the background threads when a crop is ready
+    cropReady = pyqtSignal(int)
+
+    def __init__(self, labeled_img, table, parent=None):
+        '''
+        Constructor.
+
+        Args:
+            labeled_img: Labeled image.
+            table: ParticleTable of the labeled image.
+        '''
+        super(ParticleBrowser, self).__init__(parent)
+        self.labeled_img = labeled_img
+        self.table = table
+        # Runs of all the labels, sorted by label: the runs of the label k are
+        # the ones from offsets[k] until offsets[k + 1]
+        self.runs, self.offsets = get_label_runs(labeled_img)
+        # Positions in the table of the particles with pixels
+        self.positions = np.flatnonzero(table.area > 0)
+        self.index = 0
+        # Crops being drawn, or already drawn, around the shown particle
+        self.crops = {}
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+        self.view = ParticleView()
+        self.label = QLabel()
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(0, max(len(self.positions) - 1, 0))
+        self.slider.valueChanged.connect(self.show_particle)
+        self.cropReady.connect(self.on_crop_ready)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.view)
+        layout.addWidget(self.slider)
+        layout.addWidget(self.label)
+        self.setLayout(layout)
+        self.setWindowTitle("Particle browser")
+
+        if len(self.positions):
+            self.show_particle(0)
+
+    def request_crop(self, index):
+        '''
+        Start drawing the crop of a particle in the background, if it is not
+        already drawn.
+
+        Args:
+            index: Index of the particle (in self.positions).
+
+        Returns:
+            The future of the crop.
+        '''
+        if index not in self.crops:
+            position = self.positions[index]
+            label = self.table.id[position]
+            runs = self.runs[:, self.offsets[label]:self.offsets[label + 1]]
+            future = self.executor.submit(render_crop, self.labeled_img, self.table, position, runs)
+            # When it finishes, the signal goes to the thread of the window
+            future.add_done_callback(lambda _, index=index: self.cropReady.emit(index))
+            self.crops[index] = future
+        return self.crops[index]
+
+    def show_particle(self, index):
+        '''
+        Show a particle, and prepare the particles around it.
+
+        Args:
+            index: Index of the particle (in self.positions).
+        '''
+        self.index = index
+        position = self.positions[index]
+        self.label.setText("Particle {} ({} of {}): area {}, elongation {:.2f}, angle {:.1f}".format(
+            self.table.id[position], index + 1, len(self.positions), self.table.area[position],
+            self.table.elongation[position], self.table.theta[position] * 180.0 / np.pi))
+
+        future = self.request_crop(index)
+        if future.done():
+            self.on_crop_ready(index)
+
+        # We prepare the closest particles first
+        for distance in range(1, PREFETCH_RADIUS + 1):
+            for neighbour in [index + distance, index - distance]:
+                if 0 <= neighbour < len(self.positions):
+                    self.request_crop(neighbour)
+        # We forget the crops that are far from the shown particle
+        for old_index in [i for i in self.crops if abs(i - index) > 2 * PREFETCH_RADIUS]:
+            self.crops.pop(old_index).cancel()
+
+    def on_crop_ready(self, index):
+        '''
+        Show the crop of the particle, if it is still the particle we want to see.
+        '''
+        future = self.crops.get(index)
+        if index != self.index or future is None or not future.done() or future.cancelled():
+            return
+        position = self.positions[index]
+        ellipse = ((self.table.mass_center_row[position], self.table.mass_center_col[position]),
+            (self.table.theta[position], self.table.major_axis[position], self.table.minor_axis[position]))
+        self.view.set_particle(*future.result(), ellipse)
+
+    def keyPressEvent(self, event):
+        '''
+        The arrow keys show the previous and the next particle.
+        '''
+        if event.key() in (Qt.Key_Right, Qt.Key_Down, Qt.Key_Space):
+            self.slider.setValue(min(self.index + 1, len(self.positions) - 1))
+        elif event.key() in (Qt.Key_Left, Qt.Key_Up):
+            self.slider.setValue(max(self.index - 1, 0))
+        else:
+            super(ParticleBrowser, self).keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.executor.shutdown(wait=False)
+        super(ParticleBrowser, self).closeEvent(event)
+
+def main():
+    '''
+    We load the labeled image of the example, we compute the parameters of its
+    particles, and we show them in the browser.
+    '''
+    labeled_img_filepath = os.path.join(root_dir, 'images', 'labeled_metal_2.png')
+    labeled_img = cv2.imread(labeled_img_filepath, cv2.IMREAD_GRAYSCALE | cv2.IMREAD_ANYDEPTH)
+    if labeled_img is None:
+        print("We couldn't load the image located at {}".format(labeled_img_filepath))
+        return
+
+    app = QApplication(sys.argv)
+    browser = ParticleBrowser(labeled_img, compute_particle_table(labeled_img))
+    browser.show()
+    sys.exit(app.exec_())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import numpy as np
+from rendering import render_particles
+
+'''
+Query engine to filter the particles of a ParticleTable by ranges of their
+parameters, as in: 10 < elongation, 30 < theta < 70 and area < 1700.
+
+When the engine is created, we sort each column of the table once, and we keep
+the sorted values and the positions of the particles in that order (an index).
+Then, for each range of a query:
+    1) The particles that are inside the range are all together in the sorted
+        column, so we find where they start and where they end with a binary
+        search (np.searchsorted). This costs log(N), whatever the range is.
+    2) We start from the range with less particles, and we keep only the
+        particles that are also inside the other ranges, checking their values
+        in the columns of the table.
+
+This way, the work of a query depends on the amount of particles inside the most
+selective range, and not on the amount of particles of the table, so the ranges
+can be changed interactively, even with hundreds of thousands of particles.
+'''
+
+class ParticleQuery(object):
+    def __init__(self, table, column_names=None):
+        '''
+        Constructor. It sorts the columns that can be queried.
+
+        Args:
+            table: ParticleTable with the particles to filter.
+            column_names (optional): Names of the columns that can be queried.
+                By default, all the columns of the table.
+        '''
+        self.table = table
+        if column_names is None:
+            column_names = list(table.columns.keys())
+        # For each column, the positions of the particles sorted by their value,
+        # and the sorted values.
+        self.orders = {}
+        self.sorted_values = {}
+        for name in column_names:
+            values = table.columns[name]
+            order = np.argsort(values, kind='stable')
+            self.orders[name] = order
+            self.sorted_values[name] = values[order]
+
+    def get_range_positions(self, name, min_value=None, max_value=None):
+        '''
+        Find the particles whose value of the given column is inside a range.
+
+        Args:
+            name: Name of the column.
+            min_value (optional): The values must be greater than min_value. None
+                means no minimum.
+            max_value (optional): The values must be lower than max_value. None
+                means no maximum.
+
+        Returns:
+            Positions of the particles inside the range, in the table (not sorted).
+        '''
+        sorted_values = self.sorted_values[name]
+        start = 0
+        end = len(sorted_values)
+        # We skip the values equal to the limits, since the limits are not included
+        if min_value is not None:
+            start = np.searchsorted(sorted_values, min_value, side='right')
+        if max_value is not None:
+            end = max(start, np.searchsorted(sorted_values, max_value, side='left'))
+        return self.orders[name][start:end]
+
+    def query(self, **ranges):
+        '''
+        Find the particles that are inside all the given ranges.
+
+        Args:
+            ranges: For each column, a tuple (min_value, max_value), as in
+                query(area=(None, 1700), elongation=(10, None)). The limits are
+                not included, and None means no limit.
+
+        Returns:
+            Positions of the particles that comply with all the ranges, in the
+            table, sorted from the first to the last one.
+        '''
+        if not ranges:
+            return np.arange(len(self.table))
+
+        # Size of each range in the index: it costs two binary searches per column
+        sizes = []
+        for name, (min_value, max_value) in ranges.items():
+            sizes.append((len(self.get_range_positions(name, min_value, max_value)), name))
+        _, first_name = min(sizes)
+
+        # We start with the particles of the smallest range, and we check the rest
+        # of ranges only on them.
+        positions = self.get_range_positions(first_name, *ranges[first_name])
+        for name, (min_value, max_value) in ranges.items():
+            if name == first_name or not len(positions):
+                continue
+            values = self.table.columns[name][positions]
+            inside = np.ones(len(positions), dtype=bool)
+            if min_value is not None:
+                inside &= values > min_value
+            if max_value is not None:
+                inside &= values < max_value
+            positions = positions[inside]
+        # We sort only the particles found, to return them in the order of the table
+        return np.sort(positions)
+
+    def select(self, **ranges):
+        '''
+        Same as query, but it returns a ParticleTable with the particles found.
+        '''
+        return self.table[self.query(**ranges)]
+
+    def render_mask(self, labeled_img, positions):
+        '''
+        Create a binary image with the pixels of the given particles, in a single
+        pass over the image (see rendering.render_particles).
+
+        Args:
+            labeled_img: Labeled image from which the table was computed.
+            positions: Positions of the particles in the table (see query).
+
+        Returns:
+            Binary image, coded in 8-bits, with 1 in the pixels of the particles.
+        '''
+        return render_particles(labeled_img, self.table.columns['id'][positions])
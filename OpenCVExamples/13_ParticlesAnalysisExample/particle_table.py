@@ -0,0 +1,283 @@
+import numpy as np
+from contour_features import CONTOUR_COLUMN_NAMES, get_contour_features
+
+'''
+Table with the parameters of all the particles of a labeled image.
+
+Instead of one Particle object per particle (each one with its own attributes
+and its own copy of the pixels), the table keeps one numpy array (a column) per
+parameter, with one element per particle. The element k of every column belongs
+to the particle with label k + 1.
+
+This way:
+    - All the parameters are computed at once for all the particles, with a few
+        operations over the whole image, instead of a Python loop per particle.
+    - The particles can be filtered with numpy conditions over the columns, as in
+        table[(table.elongation > 10) & (table.area < 1700)], which returns a new
+        table with the particles that comply with the condition.
+'''
+
+# Names of the columns, in the same order as the parameters of the Particle class
+COLUMN_NAMES = ['id', 'area', 'ratio', 'width', 'height',
+    'mass_center_row', 'mass_center_col', 'min_row', 'min_col', 'max_row', 'max_col',
+    'moment_0_0', 'moment_1_0', 'moment_0_1', 'moment_1_1', 'moment_2_0', 'moment_0_2',
+    'theta', 'major_axis', 'minor_axis', 'elongation']
+
+def get_foreground(labeled_img):
+    '''
+    Get the pixels of the particles (the ones that are not background), in the
+    order of the image.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+
+    Returns:
+        Tuple with three arrays: the label, the row and the column of each pixel.
+    '''
+    np_img = np.asarray(labeled_img)
+    flat_labels = np_img.reshape(-1)
+    positions = np.flatnonzero(flat_labels)
+    rows, cols = np.divmod(positions, np_img.shape[1])
+    return flat_labels[positions], rows, cols
+
+def get_ellipse_params(m_0_0, m_2_0, m_0_2, m_1_1):
+    '''
+    Compute the equivalent ellipse of many particles at once, from their central
+    moments. It is the same computation as Particle.get_ellipse_params, but each
+    argument is an array with one element per particle.
+
+    Args:
+        m_0_0: Central moments M00
+        m_2_0: Central moments M20
+        m_0_2: Central moments M02
+        m_1_1: Central moments M11
+
+    Returns:
+        Tuple with three arrays: theta (orientation of the major axis with
+        respect to the horizontal axis, in radians), l (major axis size) and w
+        (minor axis size). The particles without pixels get zeros.
+    '''
+    m_0_0 = np.asarray(m_0_0, dtype=np.float64)
+    # We avoid the division by zero for the empty particles, that get zeros at the end
+    non_empty = m_0_0 != 0
+    area = np.where(non_empty, m_0_0, 1.0)
+    a = np.asarray(m_2_0, dtype=np.float64) / area
+    b = 2.0 * (np.asarray(m_1_1, dtype=np.float64) / area)
+    c = np.asarray(m_0_2, dtype=np.float64) / area
+
+    theta = 0.5 * np.arctan2(b, (c - a))
+    root = np.sqrt((b**2) + ((a - c)**2))
+    l = np.sqrt(8.0 * (a + c + root))
+    # Because of the rounding, a + c - root can be a tiny negative number
+    w = np.sqrt(np.maximum(8.0 * (a + c - root), 0.0))
+    return np.where(non_empty, theta, 0.0), np.where(non_empty, l, 0.0), np.where(non_empty, w, 0.0)
+
+def get_moments(labeled_img):
+    '''
+    Compute the area, the mass center and the central moments up to order 2 of
+    all the labels at once.
+
+    np.bincount with weights sums the weights of the pixels of each label, in a
+    single pass over the pixels of the particles. We sum the row, the column and their products
+    (raw moments), and we get the central moments from them:
+        M20 = sum(r^2) - sum(r)^2 / M00, M02 = sum(c^2) - sum(c)^2 / M00,
+        M11 = sum(r * c) - sum(r) * sum(c) / M00
+    The raw sums are sums of integers, so they are exact in float64 for any image
+    with less than 2^53 / rows^2 pixels per particle.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+
+    Returns:
+        Dictionary with one array per parameter (moment_0_0, mass_center_row,
+        mass_center_col, moment_1_0, moment_0_1, moment_1_1, moment_2_0 and
+        moment_0_2), with one element per label. The element 0 (background) and
+        the labels without pixels get zeros.
+    '''
+    labels, rows, cols = get_foreground(labeled_img)
+    amount_labels = int(np.max(labeled_img)) + 1 if np.size(labeled_img) else 1
+    rows = rows.astype(np.float64)
+    cols = cols.astype(np.float64)
+
+    def label_sums(weights):
+        return np.bincount(labels, weights=weights, minlength=amount_labels)
+
+    area = np.bincount(labels, minlength=amount_labels).astype(np.float64)
+    sum_rows = label_sums(rows)
+    sum_cols = label_sums(cols)
+    sum_rows_cols = label_sums(rows * cols)
+    sum_rows_2 = label_sums(rows * rows)
+    sum_cols_2 = label_sums(cols * cols)
+
+    # We avoid the division by zero for the labels without pixels
+    divisor = np.where(area != 0, area, 1.0)
+    center_row = sum_rows / divisor
+    center_col = sum_cols / divisor
+    return {
+        'moment_0_0': area,
+        'mass_center_row': center_row,
+        'mass_center_col': center_col,
+        'moment_1_0': sum_rows - center_row * area,
+        'moment_0_1': sum_cols - center_col * area,
+        'moment_1_1': sum_rows_cols - sum_rows * center_col,
+        'moment_2_0': sum_rows_2 - sum_rows * center_row,
+        'moment_0_2': sum_cols_2 - sum_cols * center_col,
+    }
+
+def get_enclosing_boxes(labeled_img):
+    '''
+    Compute the enclosing box of all the labels at once.
+
+    We sort the pixels of the particles by label, with a stable sort that keeps
+    the order of the image. Then, the first pixel of each label is in its minimum
+    row, and the last one in its maximum row. The columns are reduced with
+    np.minimum.reduceat and np.maximum.reduceat over the segment of each label.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+
+    Returns:
+        Tuple with four integer arrays (min_row, min_col, max_row, max_col), with
+        one element per label. The element 0 (background) and the labels without
+        pixels get zeros.
+    '''
+    labels, rows, cols = get_foreground(labeled_img)
+    amount_labels = int(np.max(labeled_img)) + 1 if np.size(labeled_img) else 1
+    order = np.argsort(labels, kind='stable')
+    rows = rows[order]
+    cols = cols[order]
+    counts = np.bincount(labels, minlength=amount_labels)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    boxes = [np.zeros(amount_labels, dtype=np.int64) for _ in range(4)]
+    # reduceat does not accept empty segments, so we only reduce the labels with pixels
+    non_empty = counts > 0
+    starts = offsets[:-1][non_empty]
+    ends = offsets[1:][non_empty]
+    if len(starts):
+        boxes[0][non_empty] = rows[starts]
+        boxes[1][non_empty] = np.minimum.reduceat(cols, starts)
+        boxes[2][non_empty] = rows[ends - 1]
+        boxes[3][non_empty] = np.maximum.reduceat(cols, starts)
+    return tuple(boxes)
+
+def compute_particle_table(labeled_img, contour_features=False):
+    '''
+    Compute the parameters of all the particles of a labeled image at once:
+    the moments with np.bincount (see get_moments), the enclosing boxes with
+    reduceat (see get_enclosing_boxes), and the ellipses from the moments of all
+    the particles (see get_ellipse_params).
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm. 0
+            is always the background.
+        contour_features (optional): If True, the table also contains the
+            parameters of the contour (see contour_features.py): perimeter,
+            circularity, convex_area, solidity, max_feret and min_feret.
+
+    Returns:
+        ParticleTable with one row per label, from 1 until the maximum label.
+    '''
+    np_img = np.asarray(labeled_img)
+    # We remove the background (label 0) from all the parameters
+    columns = dict((name, values[1:]) for name, values in get_moments(np_img).items())
+    boxes = get_enclosing_boxes(np_img)
+    for name, values in zip(['min_row', 'min_col', 'max_row', 'max_col'], boxes):
+        columns[name] = values[1:]
+
+    area = columns['moment_0_0']
+    columns['id'] = np.arange(1, len(area) + 1)
+    columns['area'] = area.astype(np.int64)
+    columns['ratio'] = area / float(np_img.shape[0] * np_img.shape[1])
+    columns['width'] = columns['max_col'] - columns['min_col']
+    columns['height'] = columns['max_row'] - columns['min_row']
+
+    theta, l, w = get_ellipse_params(columns['moment_0_0'], columns['moment_2_0'],
+        columns['moment_0_2'], columns['moment_1_1'])
+    columns['theta'] = theta
+    columns['major_axis'] = l
+    columns['minor_axis'] = w
+    # As in the Particle class, we assign a tiny value to avoid the division by zero
+    columns['elongation'] = np.where(area != 0, (l / np.where(w == 0, 0.01, w))**2, 0.0)
+
+    if contour_features:
+        features = get_contour_features(np_img, np.concatenate(([0], area)))
+        for name in CONTOUR_COLUMN_NAMES:
+            columns[name] = features[name][1:]
+    return ParticleTable(columns, np_img.shape)
+
+class ParticleTable(object):
+    def __init__(self, columns, image_size):
+        '''
+        Constructor.
+
+        Args:
+            columns: Dictionary with the name of each parameter, and an array
+                with its value for each particle. All the arrays must have the
+                same length.
+            image_size: Tuple with the amount of rows and columns of the image,
+                or None if the particles come from several images.
+        '''
+        lengths = set(len(values) for values in columns.values())
+        assert(len(lengths) <= 1)
+        self.columns = dict((name, np.asarray(values)) for name, values in columns.items())
+        self.image_size = tuple(image_size) if image_size is not None else None
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getattr__(self, name):
+        '''
+        The columns can be read as attributes of the table: table.area
+        '''
+        columns = self.__dict__.get('columns', {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, key):
+        '''
+        Get a column, or a new table with some of the particles.
+
+        Args:
+            key: Name of a column, or anything that numpy accepts to index an
+                array: a boolean array with one element per particle, an array
+                of positions or a slice.
+
+        Returns:
+            The array of the column if key is a name, and a ParticleTable with
+            the selected particles otherwise.
+        '''
+        if isinstance(key, str):
+            return self.columns[key]
+        if np.isscalar(key):
+            # We keep the result as a table, with a single particle
+            key = [key]
+        return ParticleTable(dict((name, values[key]) for name, values in self.columns.items()), self.image_size)
+
+    def print_particle_params(self):
+        '''
+        Print all the parmeters of the particles of the table
+        '''
+        for k in range(len(self)):
+            print("Particle ID: {}".format(self.id[k]))
+            print("Particle area: {}".format(self.area[k]))
+            print("Particle ratio: {}".format(self.ratio[k]))
+            print("Particle width: {}".format(self.width[k]))
+            print("Particle height: {}".format(self.height[k]))
+            print("Particle mass center row: {}".format(self.mass_center_row[k]))
+            print("Particle mass center columns: {}".format(self.mass_center_col[k]))
+            print("Particle enclosing rectangle [(minRow, minCol), (maxRow, maxCol)]: {}".format(
+                [(self.min_row[k], self.min_col[k]), (self.max_row[k], self.max_col[k])]))
+            print("Particle moment 0,0: {}".format(self.moment_0_0[k]))
+            print("Particle moment 1,0: {}".format(self.moment_1_0[k]))
+            print("Particle moment 0,1: {}".format(self.moment_0_1[k]))
+            print("Particle moment 1,1: {}".format(self.moment_1_1[k]))
+            print("Particle moment 2,0: {}".format(self.moment_2_0[k]))
+            print("Particle moment 0,2: {}".format(self.moment_0_2[k]))
+            print("Ellipse params (theta, l, w): ({}, {}, {})".format(self.theta[k] * 180.0 / np.pi,
+                self.major_axis[k], self.minor_axis[k]))
+            print("Elongation: {}".format(self.elongation[k]))
+            # The parameters of the contour are only in the tables computed with them
+            for name in CONTOUR_COLUMN_NAMES:
+                if name in self.columns:
+                    print("Particle {}: {}".format(name.replace('_', ' '), self.columns[name][k]))
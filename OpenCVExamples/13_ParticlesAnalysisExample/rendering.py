@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+
+'''
+Images created from a labeled image and the parameters of its particles.
+
+Instead of painting the pixels of each particle, one by one, we create a table
+(LUT) with one element per label, with the value that the pixels of that label
+must get. Then, the output image is created in a single pass, indexing the LUT
+with the labeled image: output = lut[labeled_img]. The cost does not depend on
+the amount of particles painted.
+    - To paint some of the particles, the LUT is 1 for the labels to keep, and
+        0 for the rest of labels.
+    - To paint a parameter of the particles (a heat map), the LUT contains the
+        color of the value of each particle.
+'''
+
+def render_particles(labeled_img, ids):
+    '''
+    Create a binary image with the pixels of the given particles.
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+        ids: Labels of the particles to paint.
+
+    Returns:
+        Binary image, coded in 8-bits, with 1 in the pixels of the particles.
+    '''
+    labeled_img = np.asarray(labeled_img)
+    amount_labels = int(labeled_img.max()) + 1 if labeled_img.size else 1
+    # LUT with 1 for the labels to keep. The background (0) is never kept.
+    keep = np.zeros(amount_labels, dtype=np.uint8)
+    ids = np.asarray(ids, dtype=np.int64)
+    keep[ids[(ids > 0) & (ids < amount_labels)]] = 1
+    return keep[labeled_img]
+
+def render_feature_map(labeled_img, ids, values, value_range=None, colormap=cv2.COLORMAP_JET):
+    '''
+    Create a color image where each particle is painted with the color of one of
+    its parameters (for example, the area or the elongation).
+
+    Args:
+        labeled_img: Image labeled using the connected components algorithm.
+        ids: Labels of the particles to paint.
+        values: Value of the parameter for each particle, in the same order as ids.
+        value_range (optional): Tuple (min, max) of the values painted with the
+            first and the last color of the colormap. The values outside are
+            painted with these colors. By default, the minimum and the maximum
+            of the values.
+        colormap (optional): OpenCV colormap used to paint the values.
+
+    Returns:
+        BGR image, coded in 8-bits. The background and the particles that are
+        not in ids are black.
+    '''
+    labeled_img = np.asarray(labeled_img)
+    amount_labels = int(labeled_img.max()) + 1 if labeled_img.size else 1
+    ids = np.asarray(ids, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    inside = (ids > 0) & (ids < amount_labels)
+    ids = ids[inside]
+    values = values[inside]
+
+    if value_range is None:
+        value_range = (values.min(), values.max()) if values.size else (0.0, 1.0)
+    min_value, max_value = value_range
+    # We convert the values into levels from 0 until 255, and each level into a color
+    # of the colormap
+    scale = 255.0 / (max_value - min_value) if max_value > min_value else 0.0
+    levels = np.clip((values - min_value) * scale, 0, 255).astype(np.uint8)
+
+    # LUT with the color of each label. The labels that are not painted are black.
+    palette = np.zeros((amount_labels, 3), dtype=np.uint8)
+    if ids.size:
+        palette[ids] = cv2.applyColorMap(levels.reshape(1, -1), colormap).reshape(-1, 3)
+    # np.take gathers whole rows of the palette, much faster than palette[labeled_img]
+    return np.take(palette, labeled_img, axis=0)
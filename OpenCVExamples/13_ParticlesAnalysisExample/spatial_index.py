@@ -0,0 +1,293 @@
+import numpy as np
+
+'''
+Spatial index over the particles of a ParticleTable, to answer questions such
+as "which particle is below this point", "which particles are inside this region
+of interest (ROI)" or "which is the closest particle to this one".
+
+The image is divided into a grid of square cells. We keep two lists of particles
+per cell:
+    - The particles whose enclosing box touches the cell (a particle can be in
+        several cells). They are used to find the particles below a point or
+        inside a ROI.
+    - The particles whose mass center is inside the cell (each particle is in a
+        single cell). They are used to find the closest particles.
+A question only looks at the particles of the cells near the point or the ROI,
+instead of all the particles of the table.
+
+The lists of all the cells are stored together, sorted by cell, in a single array
+(as the runs of the labels in get_label_runs): the particles of the cell k are
+the ones from offsets[k] until offsets[k + 1].
+'''
+
+def expand_ranges(starts, counts):
+    '''
+    Create the positions of several ranges, all together: for each range, the
+    positions from starts[k] until starts[k] + counts[k] (not included).
+
+    Args:
+        starts: Array with the first position of each range.
+        counts: Array with the amount of positions of each range.
+
+    Returns:
+        Array with all the positions, range after range.
+    '''
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    # Position of each element inside its range: 0, 1, 2... for each range
+    range_starts = np.cumsum(counts) - counts
+    steps = np.arange(total) - np.repeat(range_starts, counts)
+    return np.repeat(np.asarray(starts, dtype=np.int64), counts) + steps
+
+def sort_by_cell(cell_ids, positions, amount_cells):
+    '''
+    Sort the particles by cell, and find where the list of each cell starts.
+
+    Args:
+        cell_ids: Cell of each element.
+        positions: Position in the table of the particle of each element.
+        amount_cells: Amount of cells of the grid.
+
+    Returns:
+        Tuple with the positions sorted by cell, and the offsets of each cell
+        (with one element more than the amount of cells).
+    '''
+    order = np.argsort(cell_ids, kind='stable')
+    counts = np.bincount(cell_ids, minlength=amount_cells)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return positions[order], offsets
+
+class ParticleSpatialIndex(object):
+    def __init__(self, table, cell_size=None):
+        '''
+        Constructor. It creates the grid with the particles of the table.
+
+        Args:
+            table: ParticleTable with the particles to index.
+            cell_size (optional): Size of the side of each cell, in pixels. By
+                default, the biggest between the usual size of the particles
+                (median of their enclosing boxes) and the mean distance between
+                particles, so each cell contains a few particles.
+        '''
+        self.table = table
+        self.image_size = table.image_size
+        # The particles without pixels are not in the index
+        self.positions = np.flatnonzero(table.area > 0)
+        self.min_row = table.min_row[self.positions]
+        self.min_col = table.min_col[self.positions]
+        self.max_row = table.max_row[self.positions]
+        self.max_col = table.max_col[self.positions]
+        self.center_row = table.mass_center_row[self.positions]
+        self.center_col = table.mass_center_col[self.positions]
+
+        if cell_size is None:
+            if len(self.positions):
+                box_size = np.median(np.maximum(self.max_row - self.min_row, self.max_col - self.min_col) + 1)
+                spacing = np.sqrt(self.image_size[0] * self.image_size[1] / float(len(self.positions)))
+                cell_size = max(box_size, spacing)
+            else:
+                cell_size = max(self.image_size)
+        self.cell_size = max(int(np.ceil(cell_size)), 1)
+        self.grid_rows = (self.image_size[0] - 1) // self.cell_size + 1
+        self.grid_cols = (self.image_size[1] - 1) // self.cell_size + 1
+        amount_cells = self.grid_rows * self.grid_cols
+        particles = np.arange(len(self.positions))
+
+        # Grid of the mass centers: each particle is in the cell of its center
+        self.center_cell_row = np.clip(self.center_row // self.cell_size, 0, self.grid_rows - 1).astype(np.int64)
+        self.center_cell_col = np.clip(self.center_col // self.cell_size, 0, self.grid_cols - 1).astype(np.int64)
+        self.center_particles, self.center_offsets = sort_by_cell(
+            self.center_cell_row * self.grid_cols + self.center_cell_col, particles, amount_cells)
+
+        # Grid of the enclosing boxes: each particle is in all the cells from the
+        # cell of its minimum row and column, until the cell of its maximum ones.
+        first_row = self.min_row // self.cell_size
+        first_col = self.min_col // self.cell_size
+        cells_rows = self.max_row // self.cell_size - first_row + 1
+        cells_cols = self.max_col // self.cell_size - first_col + 1
+        amount_box_cells = cells_rows * cells_cols
+        box_particles = np.repeat(particles, amount_box_cells)
+        # Number of each cell inside the cells of its box: 0, 1, 2...
+        steps = expand_ranges(np.zeros(len(particles)), amount_box_cells)
+        cell_row = first_row[box_particles] + steps // cells_cols[box_particles]
+        cell_col = first_col[box_particles] + steps % cells_cols[box_particles]
+        self.box_particles, self.box_offsets = sort_by_cell(
+            cell_row * self.grid_cols + cell_col, box_particles, amount_cells)
+
+    def get_cells_particles(self, cell_rows, cell_cols, particles, offsets):
+        '''
+        Get all the particles of a list of cells.
+
+        Args:
+            cell_rows: Rows of the cells in the grid.
+            cell_cols: Columns of the cells in the grid.
+            particles: Particles sorted by cell (of the centers or of the boxes).
+            offsets: Offsets of each cell in particles.
+
+        Returns:
+            Array with the particles of all the cells (the index inside this
+            object, not the position in the table).
+        '''
+        cell_rows = np.asarray(cell_rows, dtype=np.int64)
+        cell_cols = np.asarray(cell_cols, dtype=np.int64)
+        # We discard the cells outside the grid
+        valid = (cell_rows >= 0) & (cell_rows < self.grid_rows) & (cell_cols >= 0) & (cell_cols < self.grid_cols)
+        cells = cell_rows[valid] * self.grid_cols + cell_cols[valid]
+        return particles[expand_ranges(offsets[cells], offsets[cells + 1] - offsets[cells])]
+
+    def query_point(self, row, col):
+        '''
+        Find the particles whose enclosing box contains a point.
+
+        Args:
+            row: Row of the point.
+            col: Column of the point.
+
+        Returns:
+            Positions in the table of the particles found.
+        '''
+        candidates = self.get_cells_particles([row // self.cell_size], [col // self.cell_size],
+            self.box_particles, self.box_offsets)
+        inside = (self.min_row[candidates] <= row) & (self.max_row[candidates] >= row) & \
+            (self.min_col[candidates] <= col) & (self.max_col[candidates] >= col)
+        return self.positions[candidates[inside]]
+
+    def pick(self, row, col, labeled_img):
+        '''
+        Find the particle below a point (for example, the point clicked by the
+        user). The enclosing boxes give the candidates, and the labeled image
+        tells which of them (if any) has the pixel: a point can be inside the
+        enclosing box of a particle, but outside the particle.
+
+        Args:
+            row: Row of the point.
+            col: Column of the point.
+            labeled_img: Labeled image of the particles of the table.
+
+        Returns:
+            Position in the table of the particle found, or -1 if the pixel does
+            not belong to any particle of the table.
+        '''
+        if not (0 <= row < labeled_img.shape[0] and 0 <= col < labeled_img.shape[1]):
+            return -1
+        found = self.query_point(row, col)
+        found = found[self.table.id[found] == labeled_img[row, col]]
+        return found[0] if len(found) else -1
+
+    def query_roi(self, min_row, min_col, max_row, max_col, contained=False):
+        '''
+        Find the particles inside a region of interest (ROI).
+
+        Args:
+            min_row, min_col: First row and column of the ROI.
+            max_row, max_col: Last row and column of the ROI (included).
+            contained (optional): If True, only the particles whose enclosing
+                box is completely inside the ROI. Otherwise, all the particles
+                whose enclosing box touches the ROI.
+
+        Returns:
+            Positions in the table of the particles found, sorted.
+        '''
+        first_row = max(min_row // self.cell_size, 0)
+        first_col = max(min_col // self.cell_size, 0)
+        last_row = min(max_row // self.cell_size, self.grid_rows - 1)
+        last_col = min(max_col // self.cell_size, self.grid_cols - 1)
+        cell_rows, cell_cols = np.meshgrid(np.arange(first_row, last_row + 1), np.arange(first_col, last_col + 1), indexing='ij')
+        # A particle can be in several cells of the ROI, so we remove the repeated ones
+        candidates = np.unique(self.get_cells_particles(cell_rows.reshape(-1), cell_cols.reshape(-1),
+            self.box_particles, self.box_offsets))
+        if contained:
+            inside = (self.min_row[candidates] >= min_row) & (self.max_row[candidates] <= max_row) & \
+                (self.min_col[candidates] >= min_col) & (self.max_col[candidates] <= max_col)
+        else:
+            inside = (self.min_row[candidates] <= max_row) & (self.max_row[candidates] >= min_row) & \
+                (self.min_col[candidates] <= max_col) & (self.max_col[candidates] >= min_col)
+        return self.positions[candidates[inside]]
+
+    def nearest(self, row, col, k=1):
+        '''
+        Find the k particles whose mass centers are the closest to a point.
+
+        We look at the cells around the cell of the point, in squares of growing
+        size. A particle outside the square of radius r (in cells) is at least at
+        a distance r * cell_size, so we stop when we have k particles closer
+        than that.
+
+        Args:
+            row: Row of the point.
+            col: Column of the point.
+            k (optional): Amount of particles to find.
+
+        Returns:
+            Tuple with the positions in the table of the particles found, and
+            their distances to the point, from the closest to the farthest.
+        '''
+        k = min(k, len(self.positions))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        cell_row = int(np.clip(row // self.cell_size, 0, self.grid_rows - 1))
+        cell_col = int(np.clip(col // self.cell_size, 0, self.grid_cols - 1))
+        found = []
+        radius = 0
+        while True:
+            # Cells of the border of the square of the given radius
+            sides = np.arange(-radius, radius + 1)
+            if radius == 0:
+                ring_rows, ring_cols = np.array([0]), np.array([0])
+            else:
+                ring_rows = np.concatenate((np.full(len(sides), -radius), np.full(len(sides), radius), sides[1:-1], sides[1:-1]))
+                ring_cols = np.concatenate((sides, sides, np.full(len(sides) - 2, -radius), np.full(len(sides) - 2, radius)))
+            found.append(self.get_cells_particles(cell_row + ring_rows, cell_col + ring_cols,
+                self.center_particles, self.center_offsets))
+            candidates = np.concatenate(found)
+            if len(candidates) >= k:
+                distances = np.hypot(self.center_row[candidates] - row, self.center_col[candidates] - col)
+                closest = np.argsort(distances, kind='stable')[:k]
+                no_more_cells = radius >= max(self.grid_rows, self.grid_cols)
+                if distances[closest[-1]] <= radius * self.cell_size or no_more_cells:
+                    return self.positions[candidates[closest]], distances[closest]
+            radius += 1
+
+    def nearest_neighbor_distances(self):
+        '''
+        Compute, for each particle, the distance from its mass center to the
+        mass center of the closest particle.
+
+        For all the particles at once, we compare each particle with the
+        particles of its cell and of the 8 cells around it. If the closest one
+        is at a distance lower or equal than cell_size, it is the right one,
+        since the particles of any other cell are farther. For the rest of
+        particles (isolated ones), we use nearest.
+
+        Returns:
+            Array with one distance per particle of the table. The particles
+            without pixels, or without any other particle, get infinite.
+        '''
+        amount = len(self.positions)
+        best = np.full(amount, np.inf)
+        particles = np.arange(amount)
+        for row_offset in [-1, 0, 1]:
+            for col_offset in [-1, 0, 1]:
+                cell_rows = self.center_cell_row + row_offset
+                cell_cols = self.center_cell_col + col_offset
+                valid = (cell_rows >= 0) & (cell_rows < self.grid_rows) & (cell_cols >= 0) & (cell_cols < self.grid_cols)
+                cells = cell_rows[valid] * self.grid_cols + cell_cols[valid]
+                counts = self.center_offsets[cells + 1] - self.center_offsets[cells]
+                # Pairs (particle, particle of the neighbour cell)
+                first = np.repeat(particles[valid], counts)
+                second = self.center_particles[expand_ranges(self.center_offsets[cells], counts)]
+                distances = np.hypot(self.center_row[first] - self.center_row[second],
+                    self.center_col[first] - self.center_col[second])
+                # A particle is not its own neighbour
+                distances[first == second] = np.inf
+                np.minimum.at(best, first, distances)
+
+        # Isolated particles: the closest one can be out of the 3x3 cells
+        for particle in np.flatnonzero(best > self.cell_size):
+            positions, distances = self.nearest(self.center_row[particle], self.center_col[particle], k=2)
+            if len(distances) == 2:
+                best[particle] = distances[1]
+
+        output = np.full(len(self.table), np.inf)
+        output[self.positions] = best
+        return output
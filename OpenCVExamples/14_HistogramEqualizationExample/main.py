@@ -28,6 +28,92 @@ def get_histo(img):
             hist[img[i,j]] += 1
     return hist
 
+def get_amount_samples(max_error, confidence=0.99):
+    '''
+    Compute how many random pixels we have to take from an image so the
+    accumulative probability function computed with them differs from the real
+    one in less than max_error, at any gray-level, with the given confidence.
+
+    This bound comes from the Dvoretzky-Kiefer-Wolfowitz inequality:
+        P(max |F_n(x) - F(x)| > e) <= 2 * exp(-2 * n * e^2)
+    where F_n is the accumulative probability function of n random samples, and
+    F is the one of the full image. Note that the amount of samples does not
+    depend on the image size.
+
+    The examples 06, 09 and 14 have their own copy of this function, in the
+    same way that each example that uses image_widget.py has its own copy of it:
+    each example folder is run on its own, and the examples do not import
+    each other.
+
+    Args:
+        max_error: Maximum allowed difference between the approximated and the
+            real accumulative probability functions. Value in the range (0, 1).
+        confidence (optional): Probability that the error is lower than max_error.
+            Value in the range (0, 1).
+
+    Returns:
+        Integer with the amount of samples required.
+    '''
+    assert(max_error > 0 and max_error < 1)
+    assert(confidence > 0 and confidence < 1)
+    return int(np.ceil(np.log(2.0 / (1.0 - confidence)) / (2.0 * max_error**2)))
+
+def get_sampled_histo(img, sampling_rate=None, max_error=None, confidence=0.99):
+    '''
+    Compute an approximation of the histogram of an image, by using only a
+    random subset of its pixels. This function considers the image has a single
+    channel. It is useful for very big images, where the exact histogram is
+    expensive, and for operations such as the histogram equalization, where
+    the exact amount of pixels per level is not important.
+
+    The amount of pixels to take is given either by a sampling rate, or by the
+    maximum error we accept in the accumulative probability function (see
+    get_amount_samples). If none of them is given, or if the amount of samples
+    is higher than the amount of pixels, the exact histogram is computed.
+
+    Args:
+        img: Input image from which we want to compute the histogram
+        sampling_rate (optional): Fraction of the pixels to take, in the range (0, 1].
+        max_error (optional): Maximum error allowed in the accumulative probability
+            function. If given, it has priority over sampling_rate.
+        confidence (optional): Probability that the error is lower than max_error.
+
+    Returns:
+        Vector of N entries, where N is the amount of possible levels in the image.
+        Each position contains the estimated amount of pixels of the image
+        that have that value, so the sum of all the elements is the amount of
+        pixels of the image (as in get_histo).
+    '''
+    np_img = np.asarray(img)
+    amount_bits = 8 * np_img.itemsize
+    amount_bins = np.power(2, amount_bits)
+
+    # We determine how many pixels we have to take
+    if not max_error is None:
+        amount_samples = get_amount_samples(max_error, confidence)
+    elif not sampling_rate is None:
+        assert(sampling_rate > 0 and sampling_rate <= 1)
+        amount_samples = int(np.ceil(sampling_rate * np_img.size))
+    else:
+        amount_samples = np_img.size
+
+    if amount_samples >= np_img.size:
+        # Taking as many samples as pixels is not cheaper than computing the
+        # exact histogram, so we count all the pixels.
+        return np.array(np.bincount(np_img.ravel(), minlength=amount_bins), dtype=np.float64)
+
+    # We choose random rows and columns independently. This way we do not need
+    # to flatten the image, which would create a copy of it if the image is
+    # a channel of a color image.
+    rng = np.random.default_rng()
+    rows = rng.integers(0, np_img.shape[0], amount_samples)
+    cols = rng.integers(0, np_img.shape[1], amount_samples)
+    samples = np_img[rows, cols]
+
+    # We count the samples, and we scale the result so it represents the whole image
+    hist = np.bincount(samples, minlength=amount_bins)
+    return hist * (float(np_img.size) / amount_samples)
+
 def compute_acumm_prob_func(hist, rows, cols):
     '''
     Compute the accumulative probability function of a given histogram.
@@ -49,15 +135,23 @@ def compute_acumm_prob_func(hist, rows, cols):
         apf[i] = apf[i-1] + norm_hist[i]
     return apf
 
-def equalize_img_hist(img):
+def equalize_img_hist(img, sampling_rate=None, max_error=None, confidence=0.99):
     '''
     Apply the histogram equalization algorithm. This function does not depends
     if the image is color or gray-level. If it is gray-level, it will apply the
     algorithm once. If the image is color, it will apply the algorithm three times,
     once per channel.
 
+    For very big images, the histogram can be approximated from a random subset
+    of pixels (see get_sampled_histo). If max_error is given, each output level
+    differs in less than 255 * max_error from the exact equalization, with the
+    given confidence.
+
     Args:
         img: Input image that we want to equalize
+        sampling_rate (optional): Fraction of the pixels used to compute the histogram.
+        max_error (optional): Maximum error allowed in the accumulative probability function.
+        confidence (optional): Probability that the error is lower than max_error.
 
     Returns:
         Image, with the same shape as the input image. This output image has
@@ -73,7 +167,10 @@ def equalize_img_hist(img):
         assert(0)
 
     for i in range(channels):
-        channel_hist = get_histo(cloned_img[:,:,i])
+        if sampling_rate is None and max_error is None:
+            channel_hist = get_histo(cloned_img[:,:,i])
+        else:
+            channel_hist = get_sampled_histo(cloned_img[:,:,i], sampling_rate, max_error, confidence)
 
         apf = np.array(255.0 * compute_acumm_prob_func(channel_hist, cloned_img.shape[0], cloned_img.shape[1]), dtype=np.uint8)
         cloned_img[:,:,i] = apf[cloned_img[:,:,i]]
@@ -141,8 +238,14 @@ def example_histogram_equalization_hsv(img_filepath):
     hsv_img = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
     # We apply the histogram equalization algorithm. In this case, only the value
     # channel is used, which can be accessed by doing hsv_img[:,:,2],
-    # since hsv_img[:,:,0] is the hue, and hsv_img[:,:,1] is the saturation
-    hsv_img[:,:,2] = equalize_img_hist(hsv_img[:,:,2])
+    # since hsv_img[:,:,0] is the hue, and hsv_img[:,:,1] is the saturation.
+    # We compute the histogram from a random subset of the pixels: with
+    # max_error=0.005, each output level differs in less than 255 * 0.005 (about
+    # one gray-level) from the exact equalization, with 99% of confidence.
+    max_error = 0.005
+    print("Histogram of the value channel computed with {} of its {} pixels".format(
+        min(get_amount_samples(max_error), hsv_img[:,:,2].size), hsv_img[:,:,2].size))
+    hsv_img[:,:,2] = equalize_img_hist(hsv_img[:,:,2], max_error=max_error)
     # We reconvert the image into the BGR space in order to show it.
     output_img = cv2.cvtColor(hsv_img, cv2.COLOR_HSV2BGR)
 
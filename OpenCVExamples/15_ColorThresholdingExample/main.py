@@ -1,6 +1,8 @@
 import cv2
 import numpy as np
 import os
+# This module contains a class that applies a chain of morphological operations
+from morphology_pipeline import MorphologyPipeline
 
 root_dir = os.path.dirname(os.path.realpath(__file__))
 
@@ -51,27 +53,23 @@ def color_thresholding(img, min_hue, max_hue, min_sat=0, max_sat=100, min_val=0,
 
     return binary_img
 
-def filter_mask(binary_img, kernel_sizes):
+def create_filter_pipeline(kernel_sizes):
     '''
-    Apply some morphological operations to the mask, in order to filter little spots.
-    This function will apply opening operations, with an ellipse shape. Each operation
+    Create the chain of morphological operations used to filter little spots
+    of the mask: opening operations, with an ellipse shape. Each operation
     can have a different kernel size, based on the values given as arguments.
 
+    The pipeline can be created once, and applied to many masks (see filter_mask).
+
     Args:
-        binary_img: Input binary mask to filter. This image must contain only two
-            values: 0 and 1.
         kernel_sizes: List of kernel sizes value for the opening operation. If at
-            any moment, the kernel size is zero or negative, we stop the filtering,
-            and we return the current image.
+            any moment, the kernel size is zero or negative, we stop adding
+            operations to the pipeline.
 
     Returns:
-        Filtered mask. This image will be binary, with the same size as the input image,
-        with only two values, 0 and 1.
+        MorphologyPipeline object.
     '''
-    # We set the initial value of the mask to be the input mask. This way, if both filtering
-    # operations are skipped, the output will be equal to the input.
-    filtered_mask = binary_img
-
+    steps = []
     for kernel_size in kernel_sizes:
         # We check if we have to end the filtering operation.
         if kernel_size <= 0:
@@ -82,11 +80,37 @@ def filter_mask(binary_img, kernel_sizes):
         # cv2.MORPH_CROSS --> Cross shape
         # Then we specify the kernel shape, to be square (same amount of rows and columns)
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
-        # Then apply the opening operation, using the given kernel, to the input image filtered_mask.
-        # We store the result in the same variable as the input image.
-        filtered_mask = cv2.morphologyEx(filtered_mask, cv2.MORPH_OPEN, kernel, iterations=1)
+        # We add an opening operation with this kernel. The result is the same
+        # as cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel).
+        steps.append(('open', kernel))
+    return MorphologyPipeline(steps)
 
-    return filtered_mask
+def filter_mask(binary_img, kernel_sizes=None, pipeline=None):
+    '''
+    Apply some morphological operations to the mask, in order to filter little spots.
+    This function will apply opening operations, with an ellipse shape. Each operation
+    can have a different kernel size, based on the values given as arguments.
+
+    Args:
+        binary_img: Input binary mask to filter. This image must contain only two
+            values: 0 and 1.
+        kernel_sizes (optional): List of kernel sizes value for the opening operation.
+            If at any moment, the kernel size is zero or negative, we stop the
+            filtering, and we return the current image.
+        pipeline (optional): Pipeline created with create_filter_pipeline, to reuse
+            it. Only one of kernel_sizes and pipeline must be given.
+
+    Returns:
+        Filtered mask. This image will be binary, with the same size as the input image,
+        with only two values, 0 and 1. It is one of the buffers of the pipeline (it is
+        not copied), so if a pipeline is given, the mask is only valid until the next
+        time the pipeline is run: copy it if you need to keep it.
+    '''
+    # The pipeline already contains its kernel sizes, so we do not accept both
+    assert((kernel_sizes is None) != (pipeline is None))
+    if pipeline is None:
+        pipeline = create_filter_pipeline(kernel_sizes)
+    return pipeline.run(binary_img)
 
 def get_color_filtered_image(img, mask):
     '''
@@ -138,7 +162,10 @@ def main():
     #   The first time, we apply a kernel of size 7,
     #   The second time, we apply a kernel of size 10.
     #   The third time, we apply a kernel of size 12.
-    filtered_mask = filter_mask(binary_mask, [7, 10, 12])
+    pipeline = create_filter_pipeline([7, 10, 12])
+    filtered_mask = filter_mask(binary_mask, pipeline=pipeline)
+    # We show how much time each opening operation took
+    pipeline.print_timings()
 
     # We filter the color image, with the obtained mask.
     color_mask = get_color_filtered_image(img, filtered_mask)
@@ -0,0 +1,104 @@
+import cv2
+import time
+
+import numpy as np
+
+'''
+This class applies a chain of morphological operations (erode, dilate, open and
+close), each of them with its own kernel, to a binary mask.
+
+The kernels are prepared once, when the pipeline is created, so the same
+pipeline can be applied to many masks (for example, to all the frames of a
+video) without repeating it. Each step is done with cv2.erode and cv2.dilate.
+
+The intermediate results are written alternately into two images that are
+created only once (ping-pong buffers), passed to OpenCV as the dst argument,
+instead of creating a new image at each step. They are created again only if the mask size changes.
+
+A step is skipped when it cannot change the mask: if the mask is empty (all
+zeros) or full (all ones), any erosion or dilation gives the same mask back.
+
+The time spent in each step of the last run is kept in self.timings.
+'''
+class MorphologyPipeline(object):
+    # Primitive operations (erosion or dilation) of each kind of step
+    STEP_PRIMITIVES = {
+        'erode': (cv2.erode,),
+        'dilate': (cv2.dilate,),
+        'open': (cv2.erode, cv2.dilate),
+        'close': (cv2.dilate, cv2.erode),
+    }
+
+    def __init__(self, steps):
+        '''
+        Constructor.
+
+        Args:
+            steps: List of tuples (operation, kernel), where operation is one
+                of 'erode', 'dilate', 'open' or 'close', and kernel is the
+                structuring element used in that step.
+        '''
+        self.steps = []
+        for operation, kernel in steps:
+            assert(operation in self.STEP_PRIMITIVES)
+            self.steps.append((operation, np.array(kernel, dtype=np.uint8)))
+        self.buffers = None
+        # List of tuples (operation, seconds, skipped), one per step, of the last run
+        self.timings = []
+
+    def allocate_buffers(self, mask):
+        '''
+        Create the two images used to store the intermediate results, if they
+        do not exist yet or if they do not match the given mask.
+        '''
+        if self.buffers is None or self.buffers[0].shape != mask.shape or self.buffers[0].dtype != mask.dtype:
+            self.buffers = [np.empty_like(mask), np.empty_like(mask)]
+
+    def run(self, mask):
+        '''
+        Apply all the steps of the pipeline to the given mask.
+
+        Args:
+            mask: Binary input mask. It is not modified.
+
+        Returns:
+            Filtered mask. The returned image is one of the internal buffers of
+            the pipeline, so it is overwritten by the next run: copy it if you
+            need to keep it.
+        '''
+        mask = np.asarray(mask)
+        self.allocate_buffers(mask)
+        self.timings = []
+        # current is the image that holds the result of the previous steps, and
+        # target is the index of the buffer where the next result is written.
+        current = mask
+        target = 0
+        for operation, kernel in self.steps:
+            begin = time.time()
+            amount_ones = np.count_nonzero(current)
+            if amount_ones == 0 or amount_ones == current.size:
+                # An empty or full mask does not change anymore
+                self.timings.append((operation, time.time() - begin, True))
+                continue
+
+            for func in self.STEP_PRIMITIVES[operation]:
+                func(current, kernel, dst=self.buffers[target])
+                current = self.buffers[target]
+                target = 1 - target
+            self.timings.append((operation, time.time() - begin, False))
+
+        if current is mask:
+            # All the steps were skipped: we return a copy, as the other cases
+            np.copyto(self.buffers[0], mask)
+            current = self.buffers[0]
+        return current
+
+    def print_timings(self):
+        '''
+        Print the time spent in each step of the last run.
+        '''
+        for index, (operation, seconds, skipped) in enumerate(self.timings):
+            if skipped:
+                print("Step {} ({}): skipped".format(index, operation))
+            else:
+                print("Step {} ({}): {:.4f} sec".format(index, operation, seconds))
@@ -38,7 +38,7 @@ class ImageWidget(QWidget):
 
         self.grayscale_colortable = np.array([qRgb(i, i, i) for i in range(256)])
 
-    def updateImage(self, new_image):
+    def updateImage(self, new_image, original_width=None):
         '''
         Change the shown image. The image provided must not be empty.
         If it is a gray level image, we show it as an indexed image, with a
@@ -47,15 +47,32 @@ class ImageWidget(QWidget):
 
         In this function, the provided image is resized to have a fixed width
         set on construction, and to keep the aspect ratio.
+
+        Args:
+            new_image: Image to show.
+            original_width (optional): Width of the original image, if the
+                provided image is a reduced copy of it (for example, a preview
+                image). It is used to give the pixels pressed with the mouse
+                in the coordinates of the original image. By default, the
+                width of the provided image.
         '''
         if new_image.size:
             # We compute the required scaling factor, for the desired width we
             # want to set the in image.
-            self.scaling_factor = self.desired_width / new_image.shape[1]
-            dim = (self.desired_width, int(new_image.shape[0] * self.scaling_factor))
+            resize_factor = self.desired_width / new_image.shape[1]
+            dim = (self.desired_width, int(new_image.shape[0] * resize_factor))
+            # The scaling factor between the original image and the shown one,
+            # used to convert the pressed pixels.
+            if original_width is None:
+                original_width = new_image.shape[1]
+            self.scaling_factor = self.desired_width / original_width
             # We resize the image to have the desired width, and keep the
-            # aspect ratio
-            scaled_image = cv2.resize(new_image, dim, interpolation=cv2.INTER_LINEAR)
+            # aspect ratio. If the image has already the desired width (for
+            # example, a preview image), we do not resize it.
+            if new_image.shape[1] == self.desired_width:
+                scaled_image = np.ascontiguousarray(new_image)
+            else:
+                scaled_image = cv2.resize(new_image, dim, interpolation=cv2.INTER_LINEAR)
 
             # We set the Widget size, so it does not take an unlimited space in
             # the MainWindow.
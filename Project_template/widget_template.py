@@ -3,18 +3,34 @@ from PyQt5.QtWidgets import \
     QVBoxLayout
 
 from PyQt5.QtCore import \
-    pyqtSignal
+    pyqtSignal, \
+    QTimer
 
 import numpy as np
 import cv2
 import copy
 
 class ChangeColorHSV(QWidget):
-    resultReady = pyqtSignal(np.ndarray)
+    # The processed image, and the width of the original image, so the result
+    # can be given to ImageWidget.updateImage even when it is the reduced copy
+    resultReady = pyqtSignal(np.ndarray, int)
 
     def __init__(self, parent=None):
         super(QWidget, self).__init__(parent)
         self.image = None
+        # Reduced copy of the image, with the width of the ImageWidget. While
+        # the slider moves, we process this image only, since the ImageWidget
+        # would reduce the result to this size anyway.
+        self.preview_image = None
+        self.preview_width = 480
+        # Last value received from the slider
+        self.value = None
+        # Timer used to process the full-resolution image once the slider stops
+        # moving. Each new slider value restarts the timer.
+        self.full_resolution_timer = QTimer(self)
+        self.full_resolution_timer.setSingleShot(True)
+        self.full_resolution_timer.setInterval(300)
+        self.full_resolution_timer.timeout.connect(self.on_process_full_image)
         self.initialize_widget()
 
     def initialize_widget(self):
@@ -24,11 +40,50 @@ class ChangeColorHSV(QWidget):
 
     def update_image(self, img):
         self.image = img
+        self.preview_image = None
+        if not img is None and img.shape[1] > self.preview_width:
+            # We use INTER_AREA, since it is the best interpolation to reduce images
+            scaling_factor = self.preview_width / img.shape[1]
+            dim = (self.preview_width, int(img.shape[0] * scaling_factor))
+            self.preview_image = cv2.resize(img, dim, interpolation=cv2.INTER_AREA)
 
     def clear_image(self):
+        self.full_resolution_timer.stop()
         self.image = None
+        self.preview_image = None
+
+    def process_image(self, img, value):
+        '''
+        Apply the operation of this widget to the given image. It is used for
+        both the reduced image and the full image. The reduced image is made
+        with INTER_AREA, which averages the neighbour pixels, so even point
+        operations (LUTs, thresholds, etc) give a result that is only close to
+        the reduced result of the full image (for example, at the edges of a
+        threshold). The preview is an approximation: the full image gives the
+        exact result.
+
+        Args:
+            img: Image to process
+            value: Slider value
+
+        Returns:
+            Processed image
+        '''
+        # Put your processing here
+        return img
 
     def on_process_image(self, value):
         if not self.image is None:
-            output = self.image
-            self.resultReady.emit(output)
\ No newline at end of file
+            self.value = value
+            if self.preview_image is None:
+                # The image is small, so we process it directly
+                self.resultReady.emit(self.process_image(self.image, value), self.image.shape[1])
+            else:
+                # We show the result on the reduced image, and we wait for the
+                # slider to stop to process the full image
+                self.resultReady.emit(self.process_image(self.preview_image, value), self.image.shape[1])
+                self.full_resolution_timer.start()
+
+    def on_process_full_image(self):
+        if not self.image is None:
+            self.resultReady.emit(self.process_image(self.image, self.value), self.image.shape[1])